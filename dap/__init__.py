@@ -1,10 +1,70 @@
 """Client library for managing Debug Adapter Protocol (DAP) requests & responses."""
 
+import importlib as _importlib
+import types as _types
+import typing as t
+
 from dap.client import DAPClient, ClientState
+from dap.io_handler import DAPFramingError
 from dap.protocol import ProtocolMessage, Request, Response, Event, CancelRequest, CancelResponse
 from dap.events import *
-from dap.requests import *
-from dap.types import *
 
 
 __version__ = "1.0.0"
+
+# The request and data type models are only needed by code that builds or
+# inspects them directly, so their modules are imported on first access.
+# Each name is listed under the module that defines it, so lookups go
+# straight to that module and `from dap import *` can include them.
+_LAZY_EXPORTS = {
+    "dap.types": (
+        "Source", "Checksum", "ChecksumAlgorithm", "Breakpoint",
+        "BreakpointLocation", "BreakpointMode", "BreakpointModeApplicability",
+        "Capabilities", "ColumnDescriptor", "CompletionItem",
+        "CompletionItemType", "DataBreakpoint", "DataBreakpointAccessType",
+        "DisassembledInstruction", "ExceptionBreakpointsFilter",
+        "ExceptionDetails", "ExceptionFilterOptions", "ExceptionOptions",
+        "ExceptionBreakMode", "ExceptionPathSegment", "FunctionBreakpoint",
+        "GotoTarget", "InstructionBreakpoint", "InvalidatedAreas", "Module",
+        "Scope", "SourceBreakpoint", "StackFrame", "StackFrameFormat",
+        "StepInTarget", "SteppingGranularity", "Thread", "ValueFormat",
+        "Variable", "VariablePresentationHint",
+    ),
+    "dap.requests": (
+        "InitializeRequest", "ConfigurationDoneRequest", "LaunchRequest",
+        "AttachRequest", "DisconnectRequest", "TerminateRequest",
+        "RestartRequest", "SetBreakpointsRequest",
+        "SetFunctionBreakpointsRequest", "SetExceptionBreakpointsRequest",
+        "SetDataBreakpointsRequest", "SetInstructionBreakpointsRequest",
+        "ContinueRequest", "NextRequest", "StepInRequest", "StepOutRequest",
+        "StepBackRequest", "ReverseContinueRequest", "RestartFrameRequest",
+        "GotoRequest", "PauseRequest", "StackTraceRequest", "ScopesRequest",
+        "VariablesRequest", "SetVariableRequest", "SourceRequest",
+        "ThreadsRequest", "TerminateThreadsRequest", "ModulesRequest",
+        "LoadedSourcesRequest", "EvaluateRequest", "SetExpressionRequest",
+        "StepInTargetsRequest", "GotoTargetsRequest", "CompletionsRequest",
+        "ExceptionInfoRequest", "ReadMemoryRequest", "WriteMemoryRequest",
+        "DisassembleRequest", "DataBreakpointInfoRequest",
+        "BreakpointLocationsRequest", "LocationsRequest", "AnyRequest",
+        "REQUEST_ADAPTER", "dispatch", "build_request",
+    ),
+}
+_LAZY_NAMES = {name: module for module, names in _LAZY_EXPORTS.items() for name in names}
+
+__all__ = [
+    name for name, value in globals().items()
+    if not name.startswith("_") and not isinstance(value, _types.ModuleType)
+]
+__all__ += _LAZY_NAMES
+
+
+def __getattr__(name: str) -> t.Any:
+    module_name = _LAZY_NAMES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = globals()[name] = getattr(_importlib.import_module(module_name), name)
+    return value
+
+
+def __dir__() -> t.List[str]:
+    return sorted({*globals(), *_LAZY_NAMES})
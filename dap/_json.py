@@ -0,0 +1,25 @@
+"""
+JSON encoding and decoding for DAP messages.
+
+All JSON on the wire goes through these helpers so the codec lives in one
+place. pydantic-core is already a dependency and both parses and serializes
+natively, so no separate codec is needed.
+"""
+
+import typing as t
+
+from pydantic_core import from_json, to_json
+
+
+def encode(obj: t.Any) -> bytes:
+    """Serialize `obj` to compact UTF-8 JSON.
+
+    Models from `dap.types` may appear anywhere in `obj`; their unset
+    optional fields are left out rather than sent as `null`.
+    """
+    return to_json(obj, exclude_none=True)
+
+
+def decode(buf: t.Union[bytes, bytearray, str]) -> t.Any:
+    """Parse a JSON document from `buf` without copying it first."""
+    return from_json(buf)
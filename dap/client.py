@@ -6,11 +6,11 @@ using the Debug Adapter Protocol.
 """
 
 import enum
+import functools
 import typing as t
 
-from pydantic import ValidationError, TypeAdapter
-
-from dap.protocol import Request, Response, Event, CancelRequest, CancelResponse
+from dap import _json
+from dap.protocol import Request, Response, ErrorResponse, Event, CancelRequest, CancelResponse
 from dap.events import (
     InitializedEvent, StoppedEvent, ContinuedEvent, ExitedEvent, 
     TerminatedEvent, ThreadEvent, OutputEvent, BreakpointEvent,
@@ -18,12 +18,10 @@ from dap.events import (
     ProgressStartEvent, ProgressUpdateEvent, ProgressEndEvent,
     InvalidatedEvent, MemoryEvent
 )
-from dap.requests import *
-from dap.io_handler import _make_request, _make_response, _make_event, _parse_messages
-from dap.types import Capabilities
+from dap.io_handler import DAPFramingError, _frame_bounds, _make_request, _make_response, _make_event, _parse_content, _parse_messages
 
 
-class ClientState(enum.Enum):
+class ClientState(enum.IntEnum):
     """Client connection states."""
     NOT_INITIALIZED = enum.auto()
     WAITING_FOR_INITIALIZED = enum.auto()
@@ -33,6 +31,22 @@ class ClientState(enum.Enum):
     EXITED = enum.auto()
 
 
+# Every request helper checks the state, so the common case is a cached
+# identity comparison rather than an enum lookup plus `__eq__`.
+_NORMAL = ClientState.NORMAL
+
+
+@functools.lru_cache(maxsize=32)
+def _encode_initialize_arguments(**arguments: t.Any) -> bytes:
+    """
+    Encode the `initialize` arguments.
+
+    They only depend on the client's constructor arguments, so applications
+    that open many sessions with the same settings reuse the encoded bytes.
+    """
+    return _json.encode(arguments)
+
+
 class DAPClient:
     """
     A client for communicating with debug adapters using the Debug Adapter Protocol.
@@ -59,10 +73,12 @@ class DAPClient:
         
         # Used to save data as it comes in (from `recv`) until we have a full message
         self._recv_buf = bytearray()        
-        # Things that we still need to send
-        self._send_buf = bytearray()
-        # Keeps track of which sequence numbers match to which unanswered requests
-        self._unanswered_requests: t.Dict[int, Request] = {}
+        # Size the buffered partial frame needs to be complete, once its header is in
+        self._recv_need = 0
+        # Frames that we still need to send, joined once in `send`
+        self._send_buf: t.List[bytes] = []
+        # Maps the sequence numbers of unanswered requests to their commands
+        self._unanswered_requests: t.Dict[int, str] = {}
         # Sequence number counter
         self._seq_counter = 0
         # Client capabilities
@@ -78,22 +94,22 @@ class DAPClient:
         # Send initialize request
         self._send_request(
             command="initialize",
-            arguments={
-                "clientID": clientID,
-                "clientName": clientName,
-                "adapterID": adapterID,
-                "locale": locale,
-                "linesStartAt1": linesStartAt1,
-                "columnsStartAt1": columnsStartAt1,
-                "pathFormat": pathFormat,
-                "supportsVariableType": supportsVariableType,
-                "supportsVariablePaging": supportsVariablePaging,
-                "supportsRunInTerminalRequest": supportsRunInTerminalRequest,
-                "supportsMemoryReferences": supportsMemoryReferences,
-                "supportsProgressReporting": supportsProgressReporting,
-                "supportsInvalidatedEvent": supportsInvalidatedEvent,
-                "supportsMemoryEvent": supportsMemoryEvent,
-            }
+            arguments=_encode_initialize_arguments(
+                clientID=clientID,
+                clientName=clientName,
+                adapterID=adapterID,
+                locale=locale,
+                linesStartAt1=linesStartAt1,
+                columnsStartAt1=columnsStartAt1,
+                pathFormat=pathFormat,
+                supportsVariableType=supportsVariableType,
+                supportsVariablePaging=supportsVariablePaging,
+                supportsRunInTerminalRequest=supportsRunInTerminalRequest,
+                supportsMemoryReferences=supportsMemoryReferences,
+                supportsProgressReporting=supportsProgressReporting,
+                supportsInvalidatedEvent=supportsInvalidatedEvent,
+                supportsMemoryEvent=supportsMemoryEvent,
+            )
         )
         self._state = ClientState.WAITING_FOR_INITIALIZED
 
@@ -106,26 +122,21 @@ class DAPClient:
     def is_initialized(self) -> bool:
         """Check if the client is initialized."""
         return (
-            self._state != ClientState.NOT_INITIALIZED
-            and self._state != ClientState.WAITING_FOR_INITIALIZED
+            self._state is not ClientState.NOT_INITIALIZED
+            and self._state is not ClientState.WAITING_FOR_INITIALIZED
         )
 
     def _send_request(
         self, 
         command: str, 
-        arguments: t.Optional[t.Dict[str, t.Any]] = None
+        arguments: t.Optional[t.Union[t.Dict[str, t.Any], bytes]] = None
     ) -> int:
         """Send a request to the debug adapter."""
         seq = self._seq_counter
         self._seq_counter += 1
         
-        self._send_buf += _make_request(command=command, arguments=arguments, seq=seq)
-        self._unanswered_requests[seq] = Request(
-            seq=seq, 
-            type="request", 
-            command=command, 
-            arguments=arguments
-        )
+        self._send_buf.append(_make_request(command=command, arguments=arguments, seq=seq))
+        self._unanswered_requests[seq] = command
         return seq
 
     def _send_response(
@@ -139,7 +150,7 @@ class DAPClient:
         message: t.Optional[str] = None,
     ) -> None:
         """Send a response to the debug adapter."""
-        self._send_buf += _make_response(
+        self._send_buf.append(_make_response(
             seq=seq,
             request_seq=request_seq,
             command=command,
@@ -147,7 +158,7 @@ class DAPClient:
             result=result,
             error=error,
             message=message
-        )
+        ))
 
     def _send_event(
         self,
@@ -157,94 +168,127 @@ class DAPClient:
         """Send an event to the debug adapter."""
         seq = self._seq_counter
         self._seq_counter += 1
-        self._send_buf += _make_event(event=event, body=body, seq=seq)
+        self._send_buf.append(_make_event(event=event, body=body, seq=seq))
 
     def _handle_response(self, response: Response) -> Event:
         """Handle a response from the debug adapter."""
         assert response.request_seq is not None
         
-        # Get the request if it exists
-        request = self._unanswered_requests.get(response.request_seq)
-        if request:
-            self._unanswered_requests.pop(response.request_seq)
+        # Get the command of the request if it exists
+        command = self._unanswered_requests.pop(response.request_seq, None)
         
         if not response.success:
-            # Handle error response
-            from dap.protocol import ErrorResponse
-            error_response = ErrorResponse.model_validate(response.model_dump())
-            return error_response
+            # Handle error response. The fields were already validated as a
+            # `Response`, so build the subclass without validating again.
+            return ErrorResponse.model_construct(
+                seq=response.seq,
+                type="response",
+                request_seq=response.request_seq,
+                success=False,
+                command=response.command,
+                message=response.message,
+                body=response.body or {},
+            )
         
         # Handle successful responses
-        if request and request.command == "initialize":
-            assert self._state == ClientState.WAITING_FOR_INITIALIZED
-            # Send initialized event
-            event = InitializedEvent(seq=response.seq, type="event", event="initialized")
+        if command == "initialize":
+            assert self._state is ClientState.WAITING_FOR_INITIALIZED
+            # Synthesize the initialized event. Its fields are fixed, so it is
+            # built without validation (and without building its schema).
+            event = InitializedEvent.model_construct(seq=response.seq, type="event", event="initialized")
             self._state = ClientState.NORMAL
             return event
             
-        elif request and request.command == "disconnect":
-            assert self._state == ClientState.WAITING_FOR_SHUTDOWN
-            event = TerminatedEvent(seq=response.seq, type="event", event="terminated")
+        elif command == "disconnect":
+            assert self._state is ClientState.WAITING_FOR_SHUTDOWN
+            event = TerminatedEvent.model_construct(seq=response.seq, type="event", event="terminated")
             self._state = ClientState.SHUTDOWN
             return event
             
         else:
             # Generic response handling
             event_body = {
-                "command": request.command if request else response.command,
+                "command": command or response.command,
                 "request_seq": response.request_seq,
                 "success": response.success,
                 "message": response.message,
                 "body": response.body,
             }
-            event = Event(seq=response.seq, type="event", event="response", body=event_body)
+            event = Event.model_construct(seq=response.seq, type="event", event="response", body=event_body)
             return event
 
     def _handle_request(self, request: Request) -> Event:
         """Handle a request from the debug adapter."""
         # This would typically be handled by the application using the client
         # For now, we'll just return a generic event
-        return Event(seq=request.seq, type="event", event="request")
+        return Event.model_construct(seq=request.seq, type="event", event="request")
 
     def recv(self, data: bytes) -> t.Iterator[Event]:
-        """Receive data from the debug adapter and yield events."""
+        """
+        Receive data from the debug adapter and yield events.
+
+        Raises `DAPFramingError` if the stream cannot be framed, after
+        discarding the buffered data so later messages can still be parsed.
+        """
         self._recv_buf += data
+        if len(self._recv_buf) < self._recv_need:
+            # Still inside a frame whose header was already read; don't
+            # rescan it until the rest of the payload is here.
+            return
+        self._recv_need = 0
         
         try:
-            for message in _parse_messages(self._recv_buf):
-                
-                if isinstance(message, Response):
-                    yield self._handle_response(message)
-                elif isinstance(message, Request):
-                    yield self._handle_request(message)
-                elif isinstance(message, Event):
-                    # Handle events directly - don't process them further
-                    yield message
-        except Exception:
+            yield from self._dispatch(_parse_messages(self._recv_buf))
+        except DAPFramingError:
             # Clear the buffer to prevent further parsing issues
             self._recv_buf.clear()
+            raise
+        
+        bounds = _frame_bounds(self._recv_buf) if self._recv_buf else None
+        self._recv_need = bounds[1] if bounds is not None else 0
+
+    def recv_body(self, content: bytes) -> t.Iterator[Event]:
+        """
+        Receive the payload of one frame and yield events.
+
+        For transports that split frames themselves, such as a reader using
+        `readuntil`/`readexactly`; no header parsing or buffering is done.
+        Raises `DAPFramingError` if `content` is not valid JSON.
+        """
+        yield from self._dispatch(_parse_content(content))
+
+    def _dispatch(self, messages: t.Iterable[t.Union[Request, Response, Event]]) -> t.Iterator[Event]:
+        for message in messages:
+            
+            if isinstance(message, Response):
+                yield self._handle_response(message)
+            elif isinstance(message, Request):
+                yield self._handle_request(message)
+            elif isinstance(message, Event):
+                # Handle events directly - don't process them further
+                yield message
 
     def send(self) -> bytes:
         """Get data to send to the debug adapter."""
-        send_buf = self._send_buf[:]
+        send_buf = b"".join(self._send_buf)
         self._send_buf.clear()
         return send_buf
 
     def disconnect(self) -> None:
         """Disconnect from the debug adapter."""
-        assert self._state == ClientState.NORMAL
+        assert self._state is _NORMAL
         self._send_request(command="disconnect")
         self._state = ClientState.WAITING_FOR_SHUTDOWN
 
     def launch(self, program: str, **kwargs) -> int:
         """Launch a program in the debugger."""
-        assert self._state == ClientState.NORMAL
+        assert self._state is _NORMAL
         arguments = {"program": program, **kwargs}
         return self._send_request(command="launch", arguments=arguments)
 
     def attach(self, **kwargs) -> int:
         """Attach to a running program."""
-        assert self._state == ClientState.NORMAL
+        assert self._state is _NORMAL
         return self._send_request(command="attach", arguments=kwargs)
 
     def set_breakpoints(
@@ -253,7 +297,7 @@ class DAPClient:
         breakpoints: t.List[t.Dict[str, t.Any]]
     ) -> int:
         """Set breakpoints for a source."""
-        assert self._state == ClientState.NORMAL
+        assert self._state is _NORMAL
         return self._send_request(
             command="setBreakpoints",
             arguments={"source": source, "breakpoints": breakpoints}
@@ -261,7 +305,7 @@ class DAPClient:
 
     def set_function_breakpoints(self, breakpoints: t.List[t.Dict[str, t.Any]]) -> int:
         """Set function breakpoints."""
-        assert self._state == ClientState.NORMAL
+        assert self._state is _NORMAL
         return self._send_request(
             command="setFunctionBreakpoints",
             arguments={"breakpoints": breakpoints}
@@ -269,7 +313,7 @@ class DAPClient:
 
     def set_exception_breakpoints(self, filters: t.List[str]) -> int:
         """Set exception breakpoints."""
-        assert self._state == ClientState.NORMAL
+        assert self._state is _NORMAL
         return self._send_request(
             command="setExceptionBreakpoints",
             arguments={"filters": filters}
@@ -277,54 +321,54 @@ class DAPClient:
 
     def configuration_done(self) -> int:
         """Indicate that configuration is done."""
-        assert self._state == ClientState.NORMAL
+        assert self._state is _NORMAL
         return self._send_request(command="configurationDone")
 
     def continue_execution(self, threadId: int) -> int:
         """Continue execution."""
-        assert self._state == ClientState.NORMAL
+        assert self._state is _NORMAL
         return self._send_request(command="continue", arguments={"threadId": threadId})
 
     def next(self, threadId: int) -> int:
         """Step to the next line."""
-        assert self._state == ClientState.NORMAL
+        assert self._state is _NORMAL
         return self._send_request(command="next", arguments={"threadId": threadId})
 
     def step_in(self, threadId: int) -> int:
         """Step into the current line."""
-        assert self._state == ClientState.NORMAL
+        assert self._state is _NORMAL
         return self._send_request(command="stepIn", arguments={"threadId": threadId})
 
     def step_out(self, threadId: int) -> int:
         """Step out of the current function."""
-        assert self._state == ClientState.NORMAL
+        assert self._state is _NORMAL
         return self._send_request(command="stepOut", arguments={"threadId": threadId})
 
     def pause(self, threadId: int) -> int:
         """Pause execution."""
-        assert self._state == ClientState.NORMAL
+        assert self._state is _NORMAL
         return self._send_request(command="pause", arguments={"threadId": threadId})
 
     def stack_trace(self, threadId: int, **kwargs) -> int:
         """Get the stack trace."""
-        assert self._state == ClientState.NORMAL
+        assert self._state is _NORMAL
         arguments = {"threadId": threadId, **kwargs}
         return self._send_request(command="stackTrace", arguments=arguments)
 
     def scopes(self, frameId: int) -> int:
         """Get the scopes for a stack frame."""
-        assert self._state == ClientState.NORMAL
+        assert self._state is _NORMAL
         return self._send_request(command="scopes", arguments={"frameId": frameId})
 
     def variables(self, variablesReference: int, **kwargs) -> int:
         """Get variables in a scope."""
-        assert self._state == ClientState.NORMAL
+        assert self._state is _NORMAL
         arguments = {"variablesReference": variablesReference, **kwargs}
         return self._send_request(command="variables", arguments=arguments)
 
     def set_variable(self, variablesReference: int, name: str, value: str) -> int:
         """Set the value of a variable."""
-        assert self._state == ClientState.NORMAL
+        assert self._state is _NORMAL
         return self._send_request(
             command="setVariable",
             arguments={
@@ -336,17 +380,17 @@ class DAPClient:
 
     def source(self, sourceReference: int) -> int:
         """Get the source code."""
-        assert self._state == ClientState.NORMAL
+        assert self._state is _NORMAL
         return self._send_request(command="source", arguments={"sourceReference": sourceReference})
 
     def threads(self) -> int:
         """Get all threads."""
-        assert self._state == ClientState.NORMAL
+        assert self._state is _NORMAL
         return self._send_request(command="threads")
 
     def evaluate(self, expression: str, frameId: t.Optional[int] = None, **kwargs) -> int:
         """Evaluate an expression."""
-        assert self._state == ClientState.NORMAL
+        assert self._state is _NORMAL
         arguments = {"expression": expression, **kwargs}
         if frameId is not None:
             arguments["frameId"] = frameId
@@ -1,108 +1,138 @@
 """Debug Adapter Protocol (DAP) event types."""
 
 import typing as t
-from typing_extensions import Literal
-from pydantic import BaseModel
+from typing import Literal
+from pydantic import BaseModel, ConfigDict
 
 from dap.protocol import Event
 
 
-class InitializedEvent(Event):
+# Event names, for dispatching on `Event.event` without referring to the models.
+INITIALIZED = 'initialized'
+STOPPED = 'stopped'
+CONTINUED = 'continued'
+EXITED = 'exited'
+TERMINATED = 'terminated'
+THREAD = 'thread'
+OUTPUT = 'output'
+BREAKPOINT = 'breakpoint'
+MODULE = 'module'
+LOADED_SOURCE = 'loadedSource'
+PROCESS = 'process'
+CAPABILITIES = 'capabilities'
+PROGRESS_START = 'progressStart'
+PROGRESS_UPDATE = 'progressUpdate'
+PROGRESS_END = 'progressEnd'
+INVALIDATED = 'invalidated'
+MEMORY = 'memory'
+
+
+class _DeferredEvent(Event):
+    """
+    Base of the named events below.
+
+    Most sessions only ever construct a few of these, so their validators are
+    built on first use instead of at import.
+    """
+    model_config = ConfigDict(defer_build=True)
+
+
+class InitializedEvent(_DeferredEvent):
     """Debug adapter is ready to accept configuration requests."""
     event: Literal['initialized'] = 'initialized'
 
 
-class StoppedEvent(Event):
+class StoppedEvent(_DeferredEvent):
     """Execution of the debuggee has stopped."""
     event: Literal['stopped'] = 'stopped'
     body: t.Optional[t.Dict[str, t.Any]] = None
 
 
-class ContinuedEvent(Event):
+class ContinuedEvent(_DeferredEvent):
     """Execution of the debuggee has continued."""
     event: Literal['continued'] = 'continued'
     body: t.Optional[t.Dict[str, t.Any]] = None
 
 
-class ExitedEvent(Event):
+class ExitedEvent(_DeferredEvent):
     """Debuggee has exited."""
     event: Literal['exited'] = 'exited'
     body: t.Optional[t.Dict[str, t.Any]] = None
 
 
-class TerminatedEvent(Event):
+class TerminatedEvent(_DeferredEvent):
     """Debugging has terminated."""
     event: Literal['terminated'] = 'terminated'
     body: t.Optional[t.Dict[str, t.Any]] = None
 
 
-class ThreadEvent(Event):
+class ThreadEvent(_DeferredEvent):
     """A thread has started or exited."""
     event: Literal['thread'] = 'thread'
     body: t.Optional[t.Dict[str, t.Any]] = None
 
 
-class OutputEvent(Event):
+class OutputEvent(_DeferredEvent):
     """Target has produced some output."""
     event: Literal['output'] = 'output'
     body: t.Optional[t.Dict[str, t.Any]] = None
 
 
-class BreakpointEvent(Event):
+class BreakpointEvent(_DeferredEvent):
     """Information about a breakpoint has changed."""
     event: Literal['breakpoint'] = 'breakpoint'
     body: t.Optional[t.Dict[str, t.Any]] = None
 
 
-class ModuleEvent(Event):
+class ModuleEvent(_DeferredEvent):
     """Information about a module has changed."""
     event: Literal['module'] = 'module'
     body: t.Optional[t.Dict[str, t.Any]] = None
 
 
-class LoadedSourceEvent(Event):
+class LoadedSourceEvent(_DeferredEvent):
     """Source has been added, changed, or removed."""
     event: Literal['loadedSource'] = 'loadedSource'
     body: t.Optional[t.Dict[str, t.Any]] = None
 
 
-class ProcessEvent(Event):
+class ProcessEvent(_DeferredEvent):
     """Debugger has begun debugging a new process."""
     event: Literal['process'] = 'process'
     body: t.Optional[t.Dict[str, t.Any]] = None
 
 
-class CapabilitiesEvent(Event):
+class CapabilitiesEvent(_DeferredEvent):
     """Capabilities of the debug adapter have changed."""
     event: Literal['capabilities'] = 'capabilities'
     body: t.Optional[t.Dict[str, t.Any]] = None
 
 
-class ProgressStartEvent(Event):
+class ProgressStartEvent(_DeferredEvent):
     """Long running operation is about to start."""
     event: Literal['progressStart'] = 'progressStart'
     body: t.Optional[t.Dict[str, t.Any]] = None
 
 
-class ProgressUpdateEvent(Event):
+class ProgressUpdateEvent(_DeferredEvent):
     """Progress reporting needs to be updated."""
     event: Literal['progressUpdate'] = 'progressUpdate'
     body: t.Optional[t.Dict[str, t.Any]] = None
 
 
-class ProgressEndEvent(Event):
+class ProgressEndEvent(_DeferredEvent):
     """Progress reporting has ended."""
     event: Literal['progressEnd'] = 'progressEnd'
     body: t.Optional[t.Dict[str, t.Any]] = None
 
 
-class InvalidatedEvent(Event):
+class InvalidatedEvent(_DeferredEvent):
     """State in the debug adapter has changed."""
     event: Literal['invalidated'] = 'invalidated'
     body: t.Optional[t.Dict[str, t.Any]] = None
 
 
-class MemoryEvent(Event):
+class MemoryEvent(_DeferredEvent):
     """Memory range has been updated."""
     event: Literal['memory'] = 'memory'
     body: t.Optional[t.Dict[str, t.Any]] = None
\ No newline at end of file
@@ -4,55 +4,145 @@ Debug Adapter Protocol (DAP) IO handler.
 This module handles the parsing and serialization of DAP messages.
 """
 
-import json
 import re
 import typing as t
 
-from pydantic import TypeAdapter
+from pydantic import Field, TypeAdapter, ValidationError
 
+from dap import _json
 from dap.protocol import Event, Request, Response
 
-_CONTENT_TYPE_PARAM_RE = re.compile(r'(\w+)\s*=\s*(?:(?:"([^"]*)")|([^;,\s]*))')
+# `Content-Length` is the only header DAP requires; any others are skipped.
+_CONTENT_LENGTH_RE = re.compile(rb"^Content-Length:[ \t]*(\d+)[ \t]*\r\n", re.IGNORECASE | re.MULTILINE)
+_BATCH_RE = re.compile(rb"\s*\[")
 
+# Per the DAP overview, the only required header is `Content-Length`.
+# We intentionally omit `Content-Type` to be maximally compatible with
+# adapters that only implement the minimal header handling. Frames are
+# formatted in one step so each message is a single allocation.
+_FRAME = b"Content-Length: %d\r\n\r\n%b"
 
-def _make_headers(content_length: int, encoding: str = "utf-8") -> bytes:
-    """Create headers for DAP messages.
+# Building a TypeAdapter is far more expensive than validating with one, so
+# the adapter used on every inbound message is created once at import. The
+# `type` discriminator lets pydantic-core pick the model directly, and
+# `validate_json` parses the raw bytes in the same pass.
+_Message = t.Annotated[t.Union[Request, Response, Event], Field(discriminator="type")]
+_MESSAGE_ADAPTER: TypeAdapter[t.Union[Request, Response, Event]] = TypeAdapter(_Message)
+_BATCH_ADAPTER: TypeAdapter[t.List[t.Union[Request, Response, Event]]] = TypeAdapter(t.List[_Message])
 
-    Per the DAP overview, the only required header is `Content-Length`.
-    We intentionally omit `Content-Type` to be maximally compatible with
-    adapters that only implement the minimal header handling.
+
+class DAPFramingError(ValueError):
+    """Raised when the byte stream from the debug adapter cannot be framed.
+
+    This covers a header block without a `Content-Length` and a payload that
+    is not valid JSON. Payloads that are valid JSON but not valid DAP messages
+    raise pydantic's `ValidationError` instead.
+    """
+
+
+def _encode_content(content: t.Dict[str, t.Any], encoding: str = "utf-8") -> bytes:
+    """Serialize message content to JSON.
+
+    The JSON is produced as UTF-8 bytes, so the common case needs no separate
+    encode pass.
     """
-    headers_bytes = bytearray()
-    headers_bytes += f"Content-Length: {content_length}\r\n".encode(encoding)
-    headers_bytes += b"\r\n"
-    return headers_bytes
+    encoded_content = _json.encode(content)
+    if encoding.lower() not in ("utf-8", "utf8"):
+        encoded_content = encoded_content.decode("utf-8").encode(encoding)
+    return encoded_content
+
+
+def _request_template(command: str, argument: t.Optional[str] = None) -> bytes:
+    """Pre-serialize a request body whose only variable parts are integers."""
+    if argument is None:
+        return b'{"type":"request","command":"%b","seq":%%d}' % command.encode("ascii")
+    return b'{"type":"request","command":"%b","arguments":{"%b":%%d},"seq":%%d}' % (
+        command.encode("ascii"),
+        argument.encode("ascii"),
+    )
+
+
+# Stepping and inspection requests are sent constantly during a session and
+# carry at most a single integer argument, so their bodies are formatted from
+# templates instead of being serialized. Maps command -> (argument, template).
+_REQUEST_TEMPLATES: t.Dict[str, t.Tuple[t.Optional[str], bytes]] = {
+    command: (argument, _request_template(command, argument))
+    for command, argument in (
+        ("configurationDone", None),
+        ("threads", None),
+        ("continue", "threadId"),
+        ("next", "threadId"),
+        ("stepIn", "threadId"),
+        ("stepOut", "threadId"),
+        ("pause", "threadId"),
+        ("stackTrace", "threadId"),
+        ("scopes", "frameId"),
+        ("variables", "variablesReference"),
+        ("source", "sourceReference"),
+    )
+}
+
+
+_REQUEST_ENVELOPE = b'{"type":"request","command":%b,"seq":%d}'
+_REQUEST_ENVELOPE_WITH_ARGUMENTS = b'{"type":"request","command":%b,"arguments":%b,"seq":%d}'
+
+
+def _make_templated_request(
+    command: str,
+    arguments: t.Optional[t.Dict[str, t.Any]],
+    seq: int,
+) -> t.Optional[bytes]:
+    """Format a request body from `_REQUEST_TEMPLATES`, if its shape allows."""
+    template = _REQUEST_TEMPLATES.get(command)
+    if template is None:
+        return None
+    argument, body = template
+    if argument is None:
+        return body % seq if arguments is None else None
+    if arguments is None or len(arguments) != 1 or type(arguments.get(argument)) is not int:
+        return None
+    return body % (arguments[argument], seq)
 
 
 def _make_request(
     command: str,
-    arguments: t.Optional[t.Dict[str, t.Any]] = None,
+    arguments: t.Optional[t.Union[t.Dict[str, t.Any], bytes]] = None,
     seq: t.Optional[int] = None,
     *,
     encoding: str = "utf-8",
 ) -> bytes:
-    """Create a DAP request message."""
-    request = bytearray()
+    """Create a DAP request message.
 
-    content: t.Dict[str, t.Any] = {
-        "type": "request",
-        "command": command
-    }
-    if arguments is not None:
-        content["arguments"] = arguments
-    if seq is not None:
-        content["seq"] = seq
-    
-    encoded_content = json.dumps(content).encode(encoding)
+    `arguments` may also be passed as already encoded JSON bytes.
+    """
+    if seq is not None and encoding.lower() in ("utf-8", "utf8"):
+        encoded_content = None
+        if not isinstance(arguments, bytes):
+            encoded_content = _make_templated_request(command, arguments, seq)
+        if encoded_content is None:
+            # Only the command and arguments need encoding; the envelope
+            # around them is formatted directly.
+            if arguments is None:
+                encoded_content = _REQUEST_ENVELOPE % (_json.encode(command), seq)
+            else:
+                encoded_content = _REQUEST_ENVELOPE_WITH_ARGUMENTS % (
+                    _json.encode(command),
+                    arguments if isinstance(arguments, bytes) else _json.encode(arguments),
+                    seq,
+                )
+    else:
+        content: t.Dict[str, t.Any] = {
+            "type": "request",
+            "command": command
+        }
+        if arguments is not None:
+            content["arguments"] = _json.decode(arguments) if isinstance(arguments, bytes) else arguments
+        if seq is not None:
+            content["seq"] = seq
 
-    request += _make_headers(content_length=len(encoded_content), encoding=encoding)
-    request += encoded_content
+        encoded_content = _encode_content(content, encoding)
 
-    return request
+    return _FRAME % (len(encoded_content), encoded_content)
 
 
 def _make_response(
@@ -67,8 +157,6 @@ def _make_response(
     encoding: str = "utf-8",
 ) -> bytes:
     """Create a DAP response message."""
-    response = bytearray()
-
     # Set up the DAP content and encode it.
     content: t.Dict[str, t.Any] = {
         "type": "response",
@@ -84,12 +172,9 @@ def _make_response(
     if message is not None:
         content["message"] = message
         
-    encoded_content = json.dumps(content).encode(encoding)
-
-    response += _make_headers(content_length=len(encoded_content), encoding=encoding)
-    response += encoded_content
+    encoded_content = _encode_content(content, encoding)
 
-    return response
+    return _FRAME % (len(encoded_content), encoded_content)
 
 
 def _make_event(
@@ -100,8 +185,6 @@ def _make_event(
     encoding: str = "utf-8",
 ) -> bytes:
     """Create a DAP event message."""
-    event_msg = bytearray()
-
     content: t.Dict[str, t.Any] = {
         "type": "event",
         "event": event
@@ -111,94 +194,72 @@ def _make_event(
     if seq is not None:
         content["seq"] = seq
         
-    encoded_content = json.dumps(content).encode(encoding)
-
-    event_msg += _make_headers(content_length=len(encoded_content), encoding=encoding)
-    event_msg += encoded_content
+    encoded_content = _encode_content(content, encoding)
 
-    return event_msg
+    return _FRAME % (len(encoded_content), encoded_content)
 
 
-def _parse_content_type(header: str) -> tuple[str, dict[str, str]]:
-    """Parse Content-Type header."""
-    content_type, _, param_string = header.partition(";")
-    content_type = content_type.strip().lower()
+def _frame_bounds(response_buf: bytearray, start: int = 0) -> t.Optional[t.Tuple[int, int]]:
+    """Read the header of the frame at `start`.
 
-    metadata = {
-        m.group(1).lower(): (m.group(2) or m.group(3))
-        for m in _CONTENT_TYPE_PARAM_RE.finditer(param_string)
-    }
+    Returns the `(content_start, content_end)` offsets its payload will occupy,
+    or `None` if the header has not been fully received yet. The payload
+    itself may still be incomplete.
+    """
+    header_end = response_buf.find(b"\r\n\r\n", start)
+    if header_end < 0:
+        return None
 
-    return content_type, metadata
+    # Search up to and including the `\r\n` that ends the last header line.
+    # The header block is copied out so that `^` anchors at its first line.
+    match = _CONTENT_LENGTH_RE.search(response_buf[start:header_end + 2])
+    if match is None:
+        raise DAPFramingError("Missing Content-Length header")
 
+    content_start = header_end + 4
+    return content_start, content_start + int(match.group(1))
 
-def _parse_one_message(
-    response_buf: bytearray,
-) -> t.Optional[t.Iterable[t.Union[Request, Response, Event]]]:
-    """Parse a single DAP message from a bytearray."""
-    
-    if b"\r\n\r\n" not in response_buf:
-        return None
 
-    header_lines, raw_content = bytes(response_buf).split(b"\r\n\r\n", 1)
-
-    headers = {"content-type": "application/vscode-jsonrpc; charset=utf-8"}
-    for header_line in header_lines.split(b"\r\n"):
-        if b":" in header_line:
-            key, value = header_line.decode("ascii").split(": ", 1)
-            headers[key.lower()] = value
-    
-    assert "content-length" in headers
-    
-    # Content-Type and encoding (default if not provided)
-    if "content-type" in headers:
-        content_type, metadata = _parse_content_type(headers["content-type"])
-        assert content_type == "application/vscode-jsonrpc"
-        encoding = metadata.get("charset", "utf-8")
-    else:
-        # Default to utf-8 if no content-type header
-        encoding = "utf-8"
+def _find_frame(response_buf: bytearray, start: int = 0) -> t.Optional[t.Tuple[int, int]]:
+    """Locate the next complete frame at or after `start`.
 
-    content_length = int(headers["content-length"])
-    if len(raw_content) < content_length:
+    Returns the `(content_start, content_end)` offsets of the frame's payload,
+    or `None` if the frame has not been fully received yet. The buffer is not
+    modified.
+    """
+    bounds = _frame_bounds(response_buf, start)
+    if bounds is None or len(response_buf) < bounds[1]:
         return None
-    unused_bytes_count = len(raw_content) - content_length
-    raw_content = raw_content[:content_length]
-    if unused_bytes_count == 0:
-        response_buf.clear()
-    else:
-        del response_buf[:-unused_bytes_count]
+    return bounds
 
-    def parse_message(data: t.Dict[str, t.Any]) -> t.Union[Request, Response, Event]:
-        """Parse a single message."""
-        message_type = data.get("type")
-        
-        if message_type == "request":
-            return TypeAdapter(Request).validate_python(data)
-        elif message_type == "response":
-            return TypeAdapter(Response).validate_python(data)
-        elif message_type == "event":
-            return TypeAdapter(Event).validate_python(data)
-        else:
-            raise ValueError(f"Unknown message type: {message_type}")
 
+def _parse_content(raw_content: bytearray) -> t.List[t.Union[Request, Response, Event]]:
+    """Parse the JSON payload of a single frame."""
     try:
-        json_str = raw_content.decode(encoding)
-        content = json.loads(json_str)
-    except json.JSONDecodeError as e:
-        raise ValueError(f"Failed to parse JSON content: {e}")
-
-    if isinstance(content, list):
-        # Batch operation
-        return map(parse_message, content)
-    else:
-        return [parse_message(content)]
+        if _BATCH_RE.match(raw_content):
+            # Batch operation
+            return _BATCH_ADAPTER.validate_json(raw_content)
+        return [_MESSAGE_ADAPTER.validate_json(raw_content)]
+    except ValidationError as e:
+        if any(error["type"] == "json_invalid" for error in e.errors()):
+            raise DAPFramingError(f"Failed to parse JSON content: {e}") from e
+        raise
 
 
 def _parse_messages(response_buf: bytearray) -> t.Iterator[t.Union[Response, Request, Event]]:
-    """Parse all complete DAP messages from a bytearray."""
-    while True:
-        parsed = _parse_one_message(response_buf)
-        if parsed is None:
-            break
-        yield from parsed
\ No newline at end of file
+    """Parse all complete DAP messages from a bytearray.
+
+    Frames are located with a cursor, so pipelined messages are found without
+    rescanning from the start of the buffer. Consumed bytes (including a frame
+    whose payload fails to parse) are removed once, when iteration stops.
+    """
+    pos = 0
+    try:
+        while True:
+            frame = _find_frame(response_buf, pos)
+            if frame is None:
+                break
+            content_start, pos = frame
+            yield from _parse_content(response_buf[content_start:pos])
+    finally:
+        del response_buf[:pos]
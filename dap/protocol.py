@@ -6,7 +6,7 @@ Debug Adapter Protocol specification.
 """
 
 import typing as t
-from typing_extensions import Literal
+from typing import Literal
 from pydantic import BaseModel, Field
 
 
@@ -1,259 +1,309 @@
 """Debug Adapter Protocol (DAP) request types."""
 
+import sys
 import typing as t
-from typing_extensions import Literal
-from pydantic import BaseModel
+from typing import Literal
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter
 
-from dap.protocol import Request
+from dap.protocol import Request, CancelRequest
 
 
-class InitializeRequest(Request):
+class _DeferredRequest(Request):
+    """
+    Base of the command-specific requests below.
+
+    A session only uses a handful of the 40-odd commands, so their validators
+    are built on first use instead of at import.
+    """
+    model_config = ConfigDict(defer_build=True)
+
+
+class InitializeRequest(_DeferredRequest):
     """Initialize the debug adapter."""
     command: Literal['initialize'] = 'initialize'
     arguments: t.Optional[t.Dict[str, t.Any]] = None
 
 
-class ConfigurationDoneRequest(Request):
+class ConfigurationDoneRequest(_DeferredRequest):
     """Indicate that configuration is done."""
     command: Literal['configurationDone'] = 'configurationDone'
     arguments: t.Optional[t.Dict[str, t.Any]] = None
 
 
-class LaunchRequest(Request):
+class LaunchRequest(_DeferredRequest):
     """Launch a program in the debugger."""
     command: Literal['launch'] = 'launch'
     arguments: t.Optional[t.Dict[str, t.Any]] = None
 
 
-class AttachRequest(Request):
+class AttachRequest(_DeferredRequest):
     """Attach to a running program."""
     command: Literal['attach'] = 'attach'
     arguments: t.Optional[t.Dict[str, t.Any]] = None
 
 
-class DisconnectRequest(Request):
+class DisconnectRequest(_DeferredRequest):
     """Disconnect from the debugger."""
     command: Literal['disconnect'] = 'disconnect'
     arguments: t.Optional[t.Dict[str, t.Any]] = None
 
 
-class TerminateRequest(Request):
+class TerminateRequest(_DeferredRequest):
     """Terminate the debuggee."""
     command: Literal['terminate'] = 'terminate'
     arguments: t.Optional[t.Dict[str, t.Any]] = None
 
 
-class RestartRequest(Request):
+class RestartRequest(_DeferredRequest):
     """Restart the debuggee."""
     command: Literal['restart'] = 'restart'
     arguments: t.Optional[t.Dict[str, t.Any]] = None
 
 
-class SetBreakpointsRequest(Request):
+class SetBreakpointsRequest(_DeferredRequest):
     """Set breakpoints for a source."""
     command: Literal['setBreakpoints'] = 'setBreakpoints'
     arguments: t.Optional[t.Dict[str, t.Any]] = None
 
 
-class SetFunctionBreakpointsRequest(Request):
+class SetFunctionBreakpointsRequest(_DeferredRequest):
     """Set function breakpoints."""
     command: Literal['setFunctionBreakpoints'] = 'setFunctionBreakpoints'
     arguments: t.Optional[t.Dict[str, t.Any]] = None
 
 
-class SetExceptionBreakpointsRequest(Request):
+class SetExceptionBreakpointsRequest(_DeferredRequest):
     """Set exception breakpoints."""
     command: Literal['setExceptionBreakpoints'] = 'setExceptionBreakpoints'
     arguments: t.Optional[t.Dict[str, t.Any]] = None
 
 
-class SetDataBreakpointsRequest(Request):
+class SetDataBreakpointsRequest(_DeferredRequest):
     """Set data breakpoints."""
     command: Literal['setDataBreakpoints'] = 'setDataBreakpoints'
     arguments: t.Optional[t.Dict[str, t.Any]] = None
 
 
-class SetInstructionBreakpointsRequest(Request):
+class SetInstructionBreakpointsRequest(_DeferredRequest):
     """Set instruction breakpoints."""
     command: Literal['setInstructionBreakpoints'] = 'setInstructionBreakpoints'
     arguments: t.Optional[t.Dict[str, t.Any]] = None
 
 
-class ContinueRequest(Request):
+class ContinueRequest(_DeferredRequest):
     """Continue execution."""
     command: Literal['continue'] = 'continue'
     arguments: t.Optional[t.Dict[str, t.Any]] = None
 
 
-class NextRequest(Request):
+class NextRequest(_DeferredRequest):
     """Step to the next line."""
     command: Literal['next'] = 'next'
     arguments: t.Optional[t.Dict[str, t.Any]] = None
 
 
-class StepInRequest(Request):
+class StepInRequest(_DeferredRequest):
     """Step into the current line."""
     command: Literal['stepIn'] = 'stepIn'
     arguments: t.Optional[t.Dict[str, t.Any]] = None
 
 
-class StepOutRequest(Request):
+class StepOutRequest(_DeferredRequest):
     """Step out of the current function."""
     command: Literal['stepOut'] = 'stepOut'
     arguments: t.Optional[t.Dict[str, t.Any]] = None
 
 
-class StepBackRequest(Request):
+class StepBackRequest(_DeferredRequest):
     """Step back to the previous line."""
     command: Literal['stepBack'] = 'stepBack'
     arguments: t.Optional[t.Dict[str, t.Any]] = None
 
 
-class ReverseContinueRequest(Request):
+class ReverseContinueRequest(_DeferredRequest):
     """Continue execution in reverse."""
     command: Literal['reverseContinue'] = 'reverseContinue'
     arguments: t.Optional[t.Dict[str, t.Any]] = None
 
 
-class RestartFrameRequest(Request):
+class RestartFrameRequest(_DeferredRequest):
     """Restart the current stack frame."""
     command: Literal['restartFrame'] = 'restartFrame'
     arguments: t.Optional[t.Dict[str, t.Any]] = None
 
 
-class GotoRequest(Request):
+class GotoRequest(_DeferredRequest):
     """Go to a specific location."""
     command: Literal['goto'] = 'goto'
     arguments: t.Optional[t.Dict[str, t.Any]] = None
 
 
-class PauseRequest(Request):
+class PauseRequest(_DeferredRequest):
     """Pause execution."""
     command: Literal['pause'] = 'pause'
     arguments: t.Optional[t.Dict[str, t.Any]] = None
 
 
-class StackTraceRequest(Request):
+class StackTraceRequest(_DeferredRequest):
     """Get the stack trace."""
     command: Literal['stackTrace'] = 'stackTrace'
     arguments: t.Optional[t.Dict[str, t.Any]] = None
 
 
-class ScopesRequest(Request):
+class ScopesRequest(_DeferredRequest):
     """Get the scopes for a stack frame."""
     command: Literal['scopes'] = 'scopes'
     arguments: t.Optional[t.Dict[str, t.Any]] = None
 
 
-class VariablesRequest(Request):
+class VariablesRequest(_DeferredRequest):
     """Get variables in a scope."""
     command: Literal['variables'] = 'variables'
     arguments: t.Optional[t.Dict[str, t.Any]] = None
 
 
-class SetVariableRequest(Request):
+class SetVariableRequest(_DeferredRequest):
     """Set the value of a variable."""
     command: Literal['setVariable'] = 'setVariable'
     arguments: t.Optional[t.Dict[str, t.Any]] = None
 
 
-class SourceRequest(Request):
+class SourceRequest(_DeferredRequest):
     """Get the source code."""
     command: Literal['source'] = 'source'
     arguments: t.Optional[t.Dict[str, t.Any]] = None
 
 
-class ThreadsRequest(Request):
+class ThreadsRequest(_DeferredRequest):
     """Get all threads."""
     command: Literal['threads'] = 'threads'
     arguments: t.Optional[t.Dict[str, t.Any]] = None
 
 
-class TerminateThreadsRequest(Request):
+class TerminateThreadsRequest(_DeferredRequest):
     """Terminate specific threads."""
     command: Literal['terminateThreads'] = 'terminateThreads'
     arguments: t.Optional[t.Dict[str, t.Any]] = None
 
 
-class ModulesRequest(Request):
+class ModulesRequest(_DeferredRequest):
     """Get all modules."""
     command: Literal['modules'] = 'modules'
     arguments: t.Optional[t.Dict[str, t.Any]] = None
 
 
-class LoadedSourcesRequest(Request):
+class LoadedSourcesRequest(_DeferredRequest):
     """Get all loaded sources."""
     command: Literal['loadedSources'] = 'loadedSources'
     arguments: t.Optional[t.Dict[str, t.Any]] = None
 
 
-class EvaluateRequest(Request):
+class EvaluateRequest(_DeferredRequest):
     """Evaluate an expression."""
     command: Literal['evaluate'] = 'evaluate'
     arguments: t.Optional[t.Dict[str, t.Any]] = None
 
 
-class SetExpressionRequest(Request):
+class SetExpressionRequest(_DeferredRequest):
     """Set the value of an expression."""
     command: Literal['setExpression'] = 'setExpression'
     arguments: t.Optional[t.Dict[str, t.Any]] = None
 
 
-class StepInTargetsRequest(Request):
+class StepInTargetsRequest(_DeferredRequest):
     """Get step-in targets."""
     command: Literal['stepInTargets'] = 'stepInTargets'
     arguments: t.Optional[t.Dict[str, t.Any]] = None
 
 
-class GotoTargetsRequest(Request):
+class GotoTargetsRequest(_DeferredRequest):
     """Get goto targets."""
     command: Literal['gotoTargets'] = 'gotoTargets'
     arguments: t.Optional[t.Dict[str, t.Any]] = None
 
 
-class CompletionsRequest(Request):
+class CompletionsRequest(_DeferredRequest):
     """Get completions."""
     command: Literal['completions'] = 'completions'
     arguments: t.Optional[t.Dict[str, t.Any]] = None
 
 
-class ExceptionInfoRequest(Request):
+class ExceptionInfoRequest(_DeferredRequest):
     """Get exception information."""
     command: Literal['exceptionInfo'] = 'exceptionInfo'
     arguments: t.Optional[t.Dict[str, t.Any]] = None
 
 
-class ReadMemoryRequest(Request):
+class ReadMemoryRequest(_DeferredRequest):
     """Read memory."""
     command: Literal['readMemory'] = 'readMemory'
     arguments: t.Optional[t.Dict[str, t.Any]] = None
 
 
-class WriteMemoryRequest(Request):
+class WriteMemoryRequest(_DeferredRequest):
     """Write memory."""
     command: Literal['writeMemory'] = 'writeMemory'
     arguments: t.Optional[t.Dict[str, t.Any]] = None
 
 
-class DisassembleRequest(Request):
+class DisassembleRequest(_DeferredRequest):
     """Disassemble code."""
     command: Literal['disassemble'] = 'disassemble'
     arguments: t.Optional[t.Dict[str, t.Any]] = None
 
 
-class DataBreakpointInfoRequest(Request):
+class DataBreakpointInfoRequest(_DeferredRequest):
     """Get data breakpoint information."""
     command: Literal['dataBreakpointInfo'] = 'dataBreakpointInfo'
     arguments: t.Optional[t.Dict[str, t.Any]] = None
 
 
-class BreakpointLocationsRequest(Request):
+class BreakpointLocationsRequest(_DeferredRequest):
     """Get breakpoint locations."""
     command: Literal['breakpointLocations'] = 'breakpointLocations'
     arguments: t.Optional[t.Dict[str, t.Any]] = None
 
 
-class LocationsRequest(Request):
+class LocationsRequest(_DeferredRequest):
     """Get locations."""
     command: Literal['locations'] = 'locations'
     arguments: t.Optional[t.Dict[str, t.Any]] = None
+
+
+# Maps each command to its request class, built once at import. The keys are
+# interned so lookups with an interned command match on identity.
+_REQUEST_CLASSES: t.Dict[str, t.Type[Request]] = {
+    sys.intern(cls.model_fields['command'].default): cls
+    for cls in (CancelRequest, *_DeferredRequest.__subclasses__())
+}
+
+# Any known request, tagged by `command` so validation goes straight to the
+# matching class instead of trying each member in turn.
+AnyRequest = t.Annotated[t.Union[tuple(_REQUEST_CLASSES.values())], Field(discriminator='command')]
+REQUEST_ADAPTER: TypeAdapter[Request] = TypeAdapter(AnyRequest, config=ConfigDict(defer_build=True))
+
+
+def dispatch(command: str) -> t.Type[Request]:
+    """Return the request class for `command`, or `Request` if it is unknown."""
+    return _REQUEST_CLASSES.get(command, Request)
+
+
+def build_request(
+    command: str,
+    payload: t.Dict[str, t.Any],
+    untrusted: bool = False,
+) -> Request:
+    """
+    Build the typed request for `command` from the remaining message fields.
+
+    Messages produced by this client or an adapter it spawned are trusted,
+    so by default the model is constructed without validation. Pass
+    `untrusted=True` for externally-originated data to validate it fully.
+    Unknown commands fall back to the generic `Request`.
+    """
+    fields = {**payload, 'command': command}
+    if untrusted:
+        if command in _REQUEST_CLASSES:
+            return REQUEST_ADAPTER.validate_python(fields)
+        return Request.model_validate(fields)
+    return dispatch(command).model_construct(**fields)
@@ -6,13 +6,18 @@ as defined in the specification.
 """
 
 import typing as t
-from typing_extensions import Literal
-from pydantic import BaseModel
+from typing import Literal
+from pydantic import BaseModel, ConfigDict
+
+
+class _DAPType(BaseModel):
+    """Base for DAP data types: immutable, unknown fields ignored."""
+    model_config = ConfigDict(frozen=True, extra='ignore')
 
 
 # Core Types
 
-class Source(BaseModel):
+class Source(_DAPType):
     """A Source is a descriptor for source code."""
     name: t.Optional[str] = None
     path: t.Optional[str] = None
@@ -23,18 +28,18 @@ class Source(BaseModel):
     checksums: t.Optional[t.List['Checksum']] = None
 
 
-class Checksum(BaseModel):
+class Checksum(_DAPType):
     """The checksum of an item calculated by the specified algorithm."""
     algorithm: Literal['MD5', 'SHA1', 'SHA256', 'timestamp', 'other']
     checksum: str
 
 
-class ChecksumAlgorithm(BaseModel):
+class ChecksumAlgorithm(_DAPType):
     """Names of checksum algorithms that may be supported by a debug adapter."""
     pass
 
 
-class Breakpoint(BaseModel):
+class Breakpoint(_DAPType):
     """Information about a Breakpoint created in setBreakpoints or setFunctionBreakpoints."""
     id: t.Optional[int] = None
     verified: bool
@@ -48,7 +53,7 @@ class Breakpoint(BaseModel):
     offset: t.Optional[int] = None
 
 
-class BreakpointLocation(BaseModel):
+class BreakpointLocation(_DAPType):
     """Represents a single breakpoint location."""
     line: int
     column: t.Optional[int] = None
@@ -56,7 +61,7 @@ class BreakpointLocation(BaseModel):
     endColumn: t.Optional[int] = None
 
 
-class BreakpointMode(BaseModel):
+class BreakpointMode(_DAPType):
     """A BreakpointMode is provided as a option when setting breakpoints on sources or instructions."""
     mode: str
     label: str
@@ -64,12 +69,12 @@ class BreakpointMode(BaseModel):
     appliesTo: t.List['BreakpointModeApplicability']
 
 
-class BreakpointModeApplicability(BaseModel):
+class BreakpointModeApplicability(_DAPType):
     """Describes one or more type of breakpoint a BreakpointMode applies to."""
     pass
 
 
-class Capabilities(BaseModel):
+class Capabilities(_DAPType):
     """Information about the capabilities of a debug adapter."""
     supportsConfigurationDoneRequest: t.Optional[bool] = None
     supportsFunctionBreakpoints: t.Optional[bool] = None
@@ -111,7 +116,7 @@ class Capabilities(BaseModel):
     supportsSingleThreadExecutionRequests: t.Optional[bool] = None
 
 
-class ColumnDescriptor(BaseModel):
+class ColumnDescriptor(_DAPType):
     """A ColumnDescriptor specifies what module attribute to use for a column."""
     attributeName: str
     label: str
@@ -120,7 +125,7 @@ class ColumnDescriptor(BaseModel):
     width: t.Optional[int] = None
 
 
-class CompletionItem(BaseModel):
+class CompletionItem(_DAPType):
     """Represents a single completion item."""
     label: str
     text: t.Optional[str] = None
@@ -133,12 +138,12 @@ class CompletionItem(BaseModel):
     selectionLength: t.Optional[int] = None
 
 
-class CompletionItemType(BaseModel):
+class CompletionItemType(_DAPType):
     """Some predefined types for the CompletionItem."""
     pass
 
 
-class DataBreakpoint(BaseModel):
+class DataBreakpoint(_DAPType):
     """Properties of a data breakpoint passed to the setDataBreakpoints request."""
     dataId: str
     accessType: t.Optional['DataBreakpointAccessType'] = None
@@ -146,12 +151,12 @@ class DataBreakpoint(BaseModel):
     hitCondition: t.Optional[str] = None
 
 
-class DataBreakpointAccessType(BaseModel):
+class DataBreakpointAccessType(_DAPType):
     """This enumeration defines all possible access types for data breakpoints."""
     pass
 
 
-class DisassembledInstruction(BaseModel):
+class DisassembledInstruction(_DAPType):
     """Represents a single disassembled instruction."""
     address: str
     instructionBytes: t.Optional[str] = None
@@ -164,7 +169,7 @@ class DisassembledInstruction(BaseModel):
     endColumn: t.Optional[int] = None
 
 
-class ExceptionBreakpointsFilter(BaseModel):
+class ExceptionBreakpointsFilter(_DAPType):
     """An ExceptionBreakpointsFilter is shown in the UI as an option for configuring how exceptions are dealt with."""
     filter: str
     label: str
@@ -174,7 +179,7 @@ class ExceptionBreakpointsFilter(BaseModel):
     conditionDescription: t.Optional[str] = None
 
 
-class ExceptionDetails(BaseModel):
+class ExceptionDetails(_DAPType):
     """Detailed information about an exception that has occurred."""
     message: t.Optional[str] = None
     typeName: t.Optional[str] = None
@@ -184,38 +189,38 @@ class ExceptionDetails(BaseModel):
     innerException: t.Optional[t.List['ExceptionDetails']] = None
 
 
-class ExceptionFilterOptions(BaseModel):
+class ExceptionFilterOptions(_DAPType):
     """An ExceptionFilterOptions is used to specify an exception filter together with a condition for the setExceptionBreakpoints request."""
     filterId: str
     condition: t.Optional[str] = None
     mode: t.Optional[str] = None
 
 
-class ExceptionOptions(BaseModel):
+class ExceptionOptions(_DAPType):
     """An ExceptionOptions assigns configuration options to a set of exceptions."""
     path: t.Optional[t.List['ExceptionPathSegment']] = None
     breakMode: 'ExceptionBreakMode'
 
 
-class ExceptionBreakMode(BaseModel):
+class ExceptionBreakMode(_DAPType):
     """This enumeration defines all possible conditions when a thrown exception should result in a break."""
     pass
 
 
-class ExceptionPathSegment(BaseModel):
+class ExceptionPathSegment(_DAPType):
     """An ExceptionPathSegment represents a segment in a path that is used to match leafs or nodes in a tree of exceptions."""
     negate: t.Optional[bool] = None
     names: t.List[str]
 
 
-class FunctionBreakpoint(BaseModel):
+class FunctionBreakpoint(_DAPType):
     """Properties of a breakpoint passed to the setFunctionBreakpoints request."""
     name: str
     condition: t.Optional[str] = None
     hitCondition: t.Optional[str] = None
 
 
-class GotoTarget(BaseModel):
+class GotoTarget(_DAPType):
     """A GotoTarget describes a code location that can be used as a target in the 'goto' request."""
     id: int
     label: str
@@ -226,7 +231,7 @@ class GotoTarget(BaseModel):
     instructionPointerReference: t.Optional[str] = None
 
 
-class InstructionBreakpoint(BaseModel):
+class InstructionBreakpoint(_DAPType):
     """Properties of a breakpoint passed to the setInstructionBreakpoints request."""
     instructionReference: str
     offset: t.Optional[int] = None
@@ -234,12 +239,12 @@ class InstructionBreakpoint(BaseModel):
     hitCondition: t.Optional[str] = None
 
 
-class InvalidatedAreas(BaseModel):
+class InvalidatedAreas(_DAPType):
     """Logical areas that can be invalidated by the 'invalidated' event."""
     pass
 
 
-class Module(BaseModel):
+class Module(_DAPType):
     """A Module object represents a row in the modules view."""
     id: t.Union[int, str]
     name: str
@@ -252,7 +257,7 @@ class Module(BaseModel):
     addressRange: t.Optional[str] = None
 
 
-class Scope(BaseModel):
+class Scope(_DAPType):
     """A Scope is a named container for variables."""
     name: str
     presentationHint: t.Optional[Literal['arguments', 'locals', 'registers']] = None
@@ -267,7 +272,7 @@ class Scope(BaseModel):
     endColumn: t.Optional[int] = None
 
 
-class SourceBreakpoint(BaseModel):
+class SourceBreakpoint(_DAPType):
     """Properties of a breakpoint or logpoint passed to the setBreakpoints request."""
     line: int
     column: t.Optional[int] = None
@@ -276,7 +281,7 @@ class SourceBreakpoint(BaseModel):
     logMessage: t.Optional[str] = None
 
 
-class StackFrame(BaseModel):
+class StackFrame(_DAPType):
     """A Stackframe contains the source location."""
     id: int
     name: str
@@ -291,7 +296,7 @@ class StackFrame(BaseModel):
     presentationHint: t.Optional[Literal['normal', 'label', 'subtle']] = None
 
 
-class StackFrameFormat(BaseModel):
+class StackFrameFormat(_DAPType):
     """Provides formatting information for a stack frame."""
     parameters: t.Optional[bool] = None
     parameterTypes: t.Optional[bool] = None
@@ -302,29 +307,29 @@ class StackFrameFormat(BaseModel):
     includeAll: t.Optional[bool] = None
 
 
-class StepInTarget(BaseModel):
+class StepInTarget(_DAPType):
     """A StepInTarget can be used in the 'stepIn' request and identifies an element that can be stepped into."""
     id: int
     label: str
 
 
-class SteppingGranularity(BaseModel):
+class SteppingGranularity(_DAPType):
     """This enumeration defines all possible stepping granularities."""
     pass
 
 
-class Thread(BaseModel):
+class Thread(_DAPType):
     """A Thread."""
     id: int
     name: str
 
 
-class ValueFormat(BaseModel):
+class ValueFormat(_DAPType):
     """Provides formatting information for a value."""
     hex: t.Optional[bool] = None
 
 
-class Variable(BaseModel):
+class Variable(_DAPType):
     """A Variable is a name/value pair."""
     name: str
     value: str
@@ -337,7 +342,7 @@ class Variable(BaseModel):
     memoryReference: t.Optional[str] = None
 
 
-class VariablePresentationHint(BaseModel):
+class VariablePresentationHint(_DAPType):
     """Optional properties of a variable that can be used to determine how to render the variable in the UI."""
     kind: t.Optional[Literal['property', 'method', 'class', 'data', 'event', 'baseClass', 'innerClass', 'interface', 'mostDerivedClass', 'virtual', 'dataBreakpoint']] = None
     attributes: t.Optional[t.List[Literal['static', 'constant', 'readOnly', 'rawString', 'hasObjectId', 'canHaveObjectId', 'hasSideEffects', 'hasDataBreakpoint']]] = None
@@ -1,10 +1,41 @@
 #!/usr/bin/env python3
+import asyncio
+import io
+import logging
+import selectors
+import shlex
+import shutil
 import subprocess
 import threading
-import queue
 import os
+import sys
 import time
-from typing import Optional, Callable
+from collections import deque
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional, Callable, Union
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from dap import _json
+from dap.io_handler import _CONTENT_LENGTH_RE
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Large responses (`variables`, `disassemble`) can exceed the default 64 KiB
+# pipe, stalling the adapter until the editor reads. Linux lets unprivileged
+# processes grow a pipe up to /proc/sys/fs/pipe-max-size (1 MiB by default).
+_PIPE_SIZE = 1 << 20
+
+# `writev` takes at most IOV_MAX buffers per call.
+try:
+    _IOV_MAX = os.sysconf("SC_IOV_MAX")
+except (AttributeError, ValueError, OSError):
+    _IOV_MAX = 1024
 
 
 class IO:
@@ -25,8 +56,13 @@ class IO:
         """
         self.command = command
         self.working_directory = working_directory or os.getcwd()
+        # Parsed once; `shlex` keeps quoted paths with spaces intact.
+        self._argv = shlex.split(command, posix=os.name != "nt")
         self.process: Optional[subprocess.Popen] = None
         self.alive = False
+        # Buffered view of the adapter's stdout. `read()` and `read_message()`
+        # both go through it so neither loses bytes buffered by the other.
+        self._stdout: Optional[io.BufferedReader] = None
         
         # NOTE: We intentionally do NOT start a background read thread in the
         # main editor integration. The editor code (`DAPEditor.read_dap_responses`)
@@ -34,7 +70,12 @@ class IO:
         # would race with that logic and consume DAP messages before the editor
         # sees them, which breaks initialization.
         self.read_thread: Optional[threading.Thread] = None
-        self.write_queue = queue.Queue()
+
+        # Writes are queued and flushed by a background thread, so a burst
+        # of messages reaches the adapter in as few system calls as possible.
+        self._write_buffers: Deque[bytes] = deque()
+        self._write_ready = threading.Condition()
+        self.write_thread: Optional[threading.Thread] = None
         
         # Callbacks (used only by the standalone example at the bottom)
         self.on_output: Optional[Callable[[bytes], None]] = None
@@ -45,18 +86,33 @@ class IO:
             return
             
         try:
-            # Parse command
-            cmd_parts = self.command.split()
+            # On POSIX, Popen starts the process with `posix_spawn` instead of
+            # fork + exec when the executable is given as a path, there is no
+            # cwd, preexec_fn or pass_fds, and fds are not closed explicitly.
+            # Descriptors are non-inheritable by default (PEP 446), so
+            # skipping close_fds leaks nothing but the pipes.
+            argv = list(self._argv)
+            argv[0] = shutil.which(argv[0]) or argv[0]
+            cwd = self.working_directory
+            if os.path.abspath(cwd) == os.getcwd():
+                cwd = None
             self.process = subprocess.Popen(
-                cmd_parts,
+                argv,
                 stdin=subprocess.PIPE,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE,
-                cwd=self.working_directory,
+                cwd=cwd,
+                close_fds=False,
+                pass_fds=(),
                 bufsize=0  # Unbuffered
             )
             
+            self._grow_pipes()
+            self._stdout = io.BufferedReader(self.process.stdout)
             self.alive = True
+
+            self.write_thread = threading.Thread(target=self._flush_loop, daemon=True)
+            self.write_thread.start()
             
             # IMPORTANT:
             # Do NOT start the background read thread by default.
@@ -67,18 +123,34 @@ class IO:
             # self.read_thread = threading.Thread(target=self._read_loop, daemon=True)
             # self.read_thread.start()
             
-            print(f"Started debug adapter: {self.command}")
-            print(f"PID: {self.process.pid}")
+            logger.info("Started debug adapter: %s (PID %d)", self.command, self.process.pid)
             
         except Exception as e:
-            print(f"Failed to start debug adapter: {e}")
+            logger.error("Failed to start debug adapter: %s", e)
             self.alive = False
             
+    def _grow_pipes(self):
+        """Enlarge the stdin/stdout pipes where the platform supports it."""
+        if not hasattr(fcntl, "F_SETPIPE_SZ"):
+            return
+        for stream in (self.process.stdin, self.process.stdout):
+            try:
+                fcntl.fcntl(stream.fileno(), fcntl.F_SETPIPE_SZ, _PIPE_SIZE)
+            except OSError:
+                # Over the system limit; keep the default size.
+                pass
+
     def stop(self):
-        if not self.alive:
+        # A failed write also clears `alive`; the process may still need
+        # terminating then.
+        if not self.alive and not self.is_running():
             return
             
-        self.alive = False
+        with self._write_ready:
+            self.alive = False
+            self._write_ready.notify()
+        if self.write_thread:
+            self.write_thread.join(timeout=1)
         
         if self.process:
             try:
@@ -88,60 +160,171 @@ class IO:
                 self.process.kill()
                 self.process.wait()
             except Exception as e:
-                print(f"Error stopping process: {e}")
+                logger.error("Error stopping process: %s", e)
                 
         if self.read_thread:
             self.read_thread.join(timeout=1)
             
-        print("Debug adapter stopped")
+        logger.info("Debug adapter stopped")
         
-    def write(self, data: bytes):
-        """Write data to the debug adapter's stdin."""
+    def write(self, data: Union[bytes, Dict[str, Any]]):
+        """
+        Queue data to be written to the debug adapter's stdin.
+
+        `data` is either already framed bytes or a message dict, which is
+        encoded and framed here. The Content-Length is taken from the
+        encoded bytes, so the message is only serialized once.
+        """
         if not self.alive or not self.process:
-            print("[IO] Process not alive or not started, cannot write")
+            logger.warning("Process not alive or not started, cannot write")
             return
             
-        try:
-            print(f"[IO] Writing {len(data)} bytes to stdin")
-            print(f"[IO] Data: {data.decode('utf-8', errors='ignore')[:200]}")
-            self.process.stdin.write(data)
-            self.process.stdin.flush()
-            print("[IO] Data written successfully")
-        except Exception as e:
-            print(f"[IO] Error writing to debug adapter: {e}")
+        if isinstance(data, dict):
+            body = _json.encode(data)
+            buffers = (b"Content-Length: %d\r\n\r\n" % len(body), body)
+        else:
+            body = data
+            buffers = (data,)
+
+        # Checked up front so the slice is only taken when it is logged.
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("write %d bytes: %s", len(body), body[:200])
+        with self._write_ready:
+            self._write_buffers.extend(buffers)
+            self._write_ready.notify()
+
+    def _flush_loop(self):
+        """Background thread writing queued buffers to stdin."""
+        stdin = self.process.stdin
+        while True:
+            with self._write_ready:
+                while self.alive and not self._write_buffers:
+                    self._write_ready.wait()
+                if not self._write_buffers:
+                    return
+                buffers = list(self._write_buffers)
+                self._write_buffers.clear()
+
+            try:
+                self._write_all(stdin, buffers)
+            except Exception as e:
+                logger.error("Error writing to debug adapter: %s", e)
+                # Nothing will drain the queue any more, so make `write()`
+                # refuse further data instead of buffering it forever.
+                with self._write_ready:
+                    self.alive = False
+                    self._write_buffers.clear()
+                return
+
+    @staticmethod
+    def _write_all(stdin, buffers: List[bytes]):
+        """Write `buffers` in order, with one `writev` per batch where available."""
+        if not hasattr(os, "writev"):
+            # Windows has no scatter/gather write.
+            for buffer in buffers:
+                stdin.write(buffer)
+            stdin.flush()
+            return
+
+        fd = stdin.fileno()
+        while buffers:
+            written = os.writev(fd, buffers[:_IOV_MAX])
+            # Drop the buffers written in full and keep the unwritten tail
+            # of a partially written one.
+            i = 0
+            while i < len(buffers) and written >= len(buffers[i]):
+                written -= len(buffers[i])
+                i += 1
+            del buffers[:i]
+            if written:
+                buffers[0] = memoryview(buffers[0])[written:]
             
     def read(self) -> bytes:
         """Read data from the debug adapter's stdout."""
         if not self.alive or not self.process:
-            print("[IO] Process not alive or not started")
+            logger.warning("Process not alive or not started")
             return b""
             
         try:
             # Non-blocking read
-            if self.process.stdout.readable():
-                data = self.process.stdout.read(4096)
-                if data:
-                    print(f"[IO] Read {len(data)} bytes from stdout")
-                    print(f"[IO] Raw data: {data.decode('utf-8', errors='ignore')[:200]}")
+            if self._stdout.readable():
+                # `read1` returns whatever is available (up to 4096 bytes)
+                # with at most one system call, like a raw `read`.
+                data = self._stdout.read1(4096)
+                if data and logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("read %d bytes: %s", len(data), data[:200])
                 return data if data else b""
         except Exception as e:
-            print(f"[IO] Error reading from debug adapter: {e}")
+            logger.error("Error reading from debug adapter: %s", e)
             
         return b""
         
-    def _read_loop(self):
-        """Background thread for reading from stdout."""
-        while self.alive and self.process:
-            try:
-                data = self.process.stdout.read(4096)
-                if data:
-                    if self.on_output:
-                        self.on_output(data)
-                else:
-                    time.sleep(0.01)  # Small delay to prevent busy waiting
-            except Exception as e:
-                print(f"Error in read loop: {e}")
+    def read_message(self) -> bytearray:
+        """
+        Read exactly one DAP message from the debug adapter's stdout.
+
+        The header lines are read up to the blank line, then the payload is
+        read straight into a buffer sized from `Content-Length`. The complete
+        frame, headers included, is returned so it can be passed unchanged to
+        `DAPClient.recv()`. Returns an empty buffer once stdout is closed.
+        """
+        if not self.alive or not self.process:
+            return bytearray()
+
+        stdout = self._stdout
+        header = bytearray()
+        length = None
+        while True:
+            line = stdout.readline()
+            if not line:
+                return bytearray()
+            header += line
+            if line == b"\r\n":
                 break
+            name, _, value = line.partition(b":")
+            if name.strip().lower() == b"content-length":
+                length = int(value)
+        if length is None:
+            raise ValueError("Missing Content-Length header")
+
+        frame = bytearray(len(header) + length)
+        frame[:len(header)] = header
+        view = memoryview(frame)[len(header):]
+        while view:
+            n = stdout.readinto(view)
+            if not n:
+                return bytearray()
+            view = view[n:]
+        return frame
+
+    def _read_loop(self):
+        """
+        Background thread for reading from stdout.
+
+        The thread sleeps in `select` until the adapter has written something,
+        waking once a second to check whether it should stop. Windows cannot
+        select on pipes, so there it blocks in `read1` instead.
+        """
+        selector = None
+        if os.name != "nt":
+            selector = selectors.DefaultSelector()
+            selector.register(self.process.stdout, selectors.EVENT_READ)
+        try:
+            while self.alive and self.process:
+                if selector is not None and not selector.select(timeout=1.0):
+                    continue
+                # Larger than the reader's buffer, so `read1` reads straight
+                # into the result and nothing is left behind the selector's back.
+                data = self._stdout.read1(65536)
+                if not data:
+                    break
+                if self.on_output:
+                    self.on_output(data)
+        except Exception as e:
+            logger.error("Error in read loop: %s", e)
+        finally:
+            if selector is not None:
+                selector.close()
                 
     def is_running(self) -> bool:
         if not self.process:
@@ -156,17 +339,105 @@ class IO:
         return self.process.returncode
 
 
+class AsyncIO:
+    """
+    asyncio counterpart of `IO`.
+
+    The adapter's pipes are registered with the running event loop, so
+    messages are read and dispatched on the loop's thread without a
+    background reader or any locking.
+    """
+
+    def __init__(self, command: str, working_directory: Optional[str] = None):
+        self.command = command
+        self.working_directory = working_directory
+        self._argv = shlex.split(command, posix=os.name != "nt")
+        self.process: Optional[asyncio.subprocess.Process] = None
+
+    async def start(self):
+        if self.process:
+            return
+
+        self.process = await asyncio.create_subprocess_exec(
+            *self._argv,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            cwd=self.working_directory,
+        )
+        logger.info("Started debug adapter: %s (PID %d)", self.command, self.process.pid)
+
+    async def stop(self):
+        if not self.process:
+            return
+
+        if self.process.returncode is None:
+            self.process.terminate()
+            try:
+                await asyncio.wait_for(self.process.wait(), timeout=5)
+            except asyncio.TimeoutError:
+                self.process.kill()
+                await self.process.wait()
+        self.process = None
+        logger.info("Debug adapter stopped")
+
+    async def write(self, data: Union[bytes, Dict[str, Any]]):
+        """Write framed bytes, or a message dict to frame, to the adapter."""
+        if isinstance(data, dict):
+            body = _json.encode(data)
+            data = b"Content-Length: %d\r\n\r\n%b" % (len(body), body)
+        self.process.stdin.write(data)
+        await self.process.stdin.drain()
+
+    async def _read_frame(self):
+        """Read one frame as `(header, body)`, or `(b"", b"")` once stdout is closed."""
+        stdout = self.process.stdout
+        try:
+            header = await stdout.readuntil(b"\r\n\r\n")
+        except asyncio.IncompleteReadError:
+            return b"", b""
+        match = _CONTENT_LENGTH_RE.search(header)
+        if match is None:
+            raise ValueError("Missing Content-Length header")
+        try:
+            return header, await stdout.readexactly(int(match.group(1)))
+        except asyncio.IncompleteReadError:
+            return b"", b""
+
+    async def read_message(self) -> bytes:
+        """
+        Read exactly one DAP message, headers included.
+
+        Returns `b""` once stdout is closed.
+        """
+        header, body = await self._read_frame()
+        return header + body
+
+    async def read_body(self) -> bytes:
+        """
+        Read exactly one DAP message payload, for `DAPClient.recv_body`.
+
+        Returns `b""` once stdout is closed.
+        """
+        return (await self._read_frame())[1]
+
+    def is_running(self) -> bool:
+        return self.process is not None and self.process.returncode is None
+
+
 # Example usage
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+
     # Test with a simple command
-    io = IO("python -c 'print(\"Hello from debug adapter\")'")
+    adapter_io = IO("python -c 'print(\"Hello from debug adapter\")'")
     
     def on_output(data):
         print(f"Received: {data.decode()}")
         
-    io.on_output = on_output
-    io.start()
+    adapter_io.on_output = on_output
+    adapter_io.start()
     
     time.sleep(2)
     
-    io.stop()
+    adapter_io.stop()
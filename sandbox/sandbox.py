@@ -3,16 +3,18 @@ import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, scrolledtext
 import threading
 import queue
+import bisect
+import collections
 import os
 import sys
-import json  # noqa: F401  (used in debug logging and can be handy for future extensions)
-import subprocess  # noqa: F401  (reserved for potential adapter process customization)
-import time
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from dap.client import DAPClient, ClientState
+from dap.io_handler import DAPFramingError
+from dap.protocol import ErrorResponse
+from pydantic import ValidationError
 from dap.events import (
     InitializedEvent,
     StoppedEvent,
@@ -31,38 +33,105 @@ from dap_io import IO
 class DAPEditor:
     """Main editor class with DAP debugging support."""
     
+    # Oldest lines beyond this are dropped from the Output tab.
+    MAX_LOG_LINES = 5000
+    
     def __init__(self):
         self.root = tk.Tk()
         self.root.title("DAP Text Editor")
         self.root.geometry("1400x900")
         
-        # Editor state
+        self._init_state()
+        
+        self.create_menu()
+        
+        # Apply an "old" look theme
+        style = ttk.Style()
+        if 'clam' in style.theme_names():
+            style.theme_use('clam')
+        
+        self.create_toolbar()
+        self.create_main_panel()
+        self.create_status_bar()
+        
+        # The reader thread posts this after queueing events, so they are
+        # handled on the next main loop iteration instead of on a poll timer.
+        self.root.bind("<<DAPEvent>>", lambda e: self.process_dap_events())
+        self.root.bind("<<FileIODone>>", lambda e: self._process_io_results())
+        
+    def _init_state(self):
+        # Editor state. None of it needs a widget, so the handlers can also
+        # be driven without a display.
         self.current_file = None
         self.dap_client = None
         self.io_handler = None
         self.is_debugging = False
         self.breakpoints = {}  # line_number -> breakpoint_info
+        self._bp_items = {}  # line_number -> breakpoint canvas item id
+        self._bp_rows = {}  # line_number -> breakpoints tree item id
+        self._sorted_bp_lines = []  # breakpoint lines, kept sorted for setBreakpoints
+        # Bumped on every add/remove; (file, version) of the breakpoints the
+        # adapter last acknowledged.
+        self._bp_version = 0
+        self._synced_bp = None
+        # setBreakpoints requests in flight: seq -> ((file, version), lines in the order sent)
+        self._bp_syncs = {}
+        self._bp_sync_scheduled = False
+        self._line_count = 0  # lines currently shown in the line numbers gutter
+        self._pending_ln_update = None  # after_idle id of a queued gutter update
         self.current_thread_id = None
         self.variables = {}  # variable_id -> variable_info
         self.stack_frames = []  # current call stack
+        
+        # Stack traces, scopes and variables stay valid until the debuggee
+        # runs again, so they are cached per stop. `_stop_generation` is
+        # bumped whenever execution may resume; entries from an older
+        # generation are stale. Each cache maps key -> (generation, result).
+        self._stop_generation = 0
+        self._stack_cache = {}  # threadId -> stack frames
+        self._scopes_cache = {}  # frameId -> scopes
+        self._variables_cache = {}  # variablesReference -> variables
+        # (key, generation) of the outstanding request of each kind
+        self._pending_stack = None
+        self._pending_scopes = None
+        self._pending_variables = {}  # request seq -> (variablesReference, generation, tree item)
+        # Variables tree items whose children have not been fetched yet
+        self._var_refs = {}  # tree item id -> variablesReference
+        # Rows shown under each variables tree item ("" for the scopes), by
+        # name: parent item -> {name: (item, values)}
+        self._var_rows = {}
+        self._var_placeholders = {}  # tree item id -> its placeholder child
         self.initialization_timeout = None
         self.session_started = False  # ensure we only launch/configure once per debug session
+        self.debug_verbose = False  # log raw adapter traffic to the Output tab
         
         # Event handling
         self.event_queue = queue.Queue()
         
-        self.create_menu()
-        
-        # Apply an "old" look theme
-        style = ttk.Style()
-        if 'clam' in style.theme_names():
-            style.theme_use('clam')
-        
-        self.create_toolbar()
-        self.create_main_panel()
-        self.create_status_bar()
-        
-        self.process_dap_events()
+        # Completed background file operations: (callback, result, error)
+        self._io_results = queue.Queue()
+        
+        # Pending Output tab lines, written in one batch when Tk is idle
+        self._log_buf = collections.deque()
+        self._log_flush_pending = False
+        
+        # DAP event name -> handler, and response command -> handler. Each
+        # handler is passed the event's (or response's) body dict.
+        self._event_handlers = {
+            "initialized": self._on_initialized,
+            "stopped": self._on_stopped,
+            "continued": self._on_continued,
+            "output": self._on_output,
+            "exited": self._on_exited,
+            "terminated": self._on_terminated,
+            "response": self._on_response,
+        }
+        self._response_handlers = {
+            "stackTrace": self._on_stack_trace_response,
+            "scopes": self._on_scopes_response,
+            "variables": self._on_variables_response,
+            "setBreakpoints": self._on_set_breakpoints_response,
+        }
         
     def create_menu(self):
         menubar = tk.Menu(self.root)
@@ -166,16 +235,21 @@ class DAPEditor:
         self.editor.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         
         # Bind events for alignment and updates
-        self.editor.bind('<KeyRelease>', self.on_text_change)
-        self.editor.bind('<Button-1>', self.on_click)
+        # <<Modified>> only fires when the content changes, unlike
+        # <KeyRelease> which also fires for navigation and modifier keys.
+        self.editor.bind('<<Modified>>', self._on_modified)
         self.editor.bind('<Control-Button-1>', self.toggle_breakpoint)
         self.editor.bind('<Configure>', lambda e: self.update_line_numbers())
         
-        # Sync scrolling
-        def sync_scroll(*args):
-            self.line_numbers.yview_moveto(args[0])
+        # Sync scrolling. The editor reports every change of its view here,
+        # whether from the scrollbar, the mouse wheel or moving the cursor.
+        def sync_scroll(first, last):
+            self.editor.vbar.set(first, last)
+            self.line_numbers.yview_moveto(first)
             self.update_breakpoint_indicators()
             
+        self.editor.config(yscrollcommand=sync_scroll)
+            
         # We need to hook into the underlying text widget's scroll
         self.editor.vbar.config(command=self.on_scroll)
         
@@ -222,6 +296,8 @@ class DAPEditor:
         variables_scroll = ttk.Scrollbar(variables_frame, orient=tk.VERTICAL, command=self.variables_tree.yview)
         self.variables_tree.configure(yscrollcommand=variables_scroll.set)
         
+        self.variables_tree.bind("<<TreeviewOpen>>", self._on_var_open)
+        
         self.variables_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         variables_scroll.pack(side=tk.RIGHT, fill=tk.Y)
         
@@ -277,50 +353,87 @@ class DAPEditor:
         self.debug_status_label.pack(side=tk.RIGHT, padx=5)
         
     def on_scroll(self, *args):
+        # The gutter and breakpoint markers follow via `yscrollcommand`.
         self.editor.yview(*args)
-        self.line_numbers.yview_moveto(self.editor.yview()[0])
-        self.update_breakpoint_indicators()
 
-    def update_line_numbers(self):
-        self.line_numbers.config(state=tk.NORMAL)
-        self.line_numbers.delete(1.0, tk.END)
+    def _line_count_now(self):
+        # `count -lines` hands back the number of newlines as an int, without
+        # formatting an index for us to split and parse.
+        return self.editor.tk.call(self.editor._w, 'count', '-lines', '1.0', 'end-1c') + 1
         
-        line_count = int(self.editor.index('end-1c').split('.')[0])
-        lines = "\n".join(str(i) for i in range(1, line_count + 1))
-        self.line_numbers.insert(1.0, lines)
+    def update_line_numbers(self):
+        # Only the lines added or removed since the last update are touched,
+        # so typing within a line costs nothing here regardless of file size.
+        line_count = self._line_count_now()
+        old_count = self._line_count
+        if line_count != old_count:
+            self.line_numbers.config(state=tk.NORMAL)
+            if line_count > old_count:
+                if old_count:
+                    lines = "".join(f"\n{i}" for i in range(old_count + 1, line_count + 1))
+                else:
+                    lines = "\n".join(str(i) for i in range(1, line_count + 1))
+                self.line_numbers.insert('end-1c', lines)
+            else:
+                self.line_numbers.delete(f"{line_count}.end", 'end-1c')
+            self.line_numbers.config(state=tk.DISABLED)
+            self._line_count = line_count
             
-        self.line_numbers.config(state=tk.DISABLED)
         self.line_numbers.yview_moveto(self.editor.yview()[0])
         
-        # Update breakpoint indicators
-        self.update_breakpoint_indicators()
+        # Adding or removing lines can scroll the editor, moving the lines
+        # that carry breakpoints.
+        if line_count != old_count:
+            self.update_breakpoint_indicators()
         
     def update_breakpoint_indicators(self):
-        self.breakpoint_canvas.delete("all")
+        # Each breakpoint keeps its canvas item; visible ones are moved into
+        # place and the rest are removed, instead of redrawing the canvas.
+        for line_num in list(self._bp_items):
+            if line_num not in self.breakpoints:
+                self.breakpoint_canvas.delete(self._bp_items.pop(line_num))
         
         for line_num in self.breakpoints:
             # Use dlineinfo to get the exact y-coordinate of the line on screen
             try:
                 dinfo = self.editor.dlineinfo(f"{line_num}.0")
-                if dinfo:
-                    y = dinfo[1] + (dinfo[3] // 2)
-                    # Draw a red circle for breakpoint
-                    self.breakpoint_canvas.create_oval(5, y-5, 15, y+5, fill='red', outline='darkred')
             except tk.TclError:
-                continue
+                dinfo = None
+            item = self._bp_items.get(line_num)
+            if dinfo:
+                y = dinfo[1] + (dinfo[3] // 2)
+                if item is None:
+                    # Draw a red circle for breakpoint
+                    self._bp_items[line_num] = self.breakpoint_canvas.create_oval(
+                        5, y-5, 15, y+5, fill='red', outline='darkred')
+                else:
+                    self.breakpoint_canvas.coords(item, 5, y-5, 15, y+5)
+            elif item is not None:
+                self.breakpoint_canvas.delete(self._bp_items.pop(line_num))
         
     def on_text_change(self, event=None):
-        self.update_line_numbers()
+        # Coalesce a burst of key events (e.g. a held key) into one update
+        # once Tk is idle.
+        if self._pending_ln_update:
+            return
+        self._pending_ln_update = self.root.after_idle(self._do_line_number_update)
         
-    def on_click(self, event=None):
+    def _do_line_number_update(self):
+        self._pending_ln_update = None
         self.update_line_numbers()
         
+    def _on_modified(self, event=None):
+        # Resetting the flag raises <<Modified>> again; that one is ignored.
+        if self.editor.edit_modified():
+            self.editor.edit_modified(False)
+            self.on_text_change()
+        
     def on_breakpoint_click(self, event=None):
         if not self.current_file:
             return
             
         # Find which line was clicked by comparing y-coordinate with dlineinfo
-        line_count = int(self.editor.index('end-1c').split('.')[0])
+        line_count = self._line_count_now()
         clicked_line = None
         
         for i in range(1, line_count + 1):
@@ -351,32 +464,50 @@ class DAPEditor:
             self.add_breakpoint(line)
             
     def add_breakpoint(self, line):
-        self.breakpoints[line] = {"line": line, "verified": False}
+        # `verified` stays None until the adapter has answered for this line.
+        self.breakpoints[line] = {"line": line, "verified": None}
+        bisect.insort(self._sorted_bp_lines, line)
+        self._bp_version += 1
         
         filename = os.path.basename(self.current_file) if self.current_file else "Unknown"
-        self.breakpoints_tree.insert("", tk.END, text=filename, values=(line, "Pending"))
+        self._bp_rows[line] = self.breakpoints_tree.insert("", tk.END, text=filename, values=(line, "Pending"))
         self.update_breakpoint_indicators()
         
         # send updated breakpoints to the debug adapter if connected
         if self.dap_client and self.dap_client.is_initialized:
-            self.sync_breakpoints()
+            self._schedule_breakpoint_sync()
             
     def remove_breakpoint(self, line):
         if line in self.breakpoints:
             del self.breakpoints[line]
+            del self._sorted_bp_lines[bisect.bisect_left(self._sorted_bp_lines, line)]
+            self._bp_version += 1
+            item = self._bp_items.pop(line, None)
+            if item is not None:
+                self.breakpoint_canvas.delete(item)
             
             # Update UI
-            for item in self.breakpoints_tree.get_children():
-                if self.breakpoints_tree.item(item)["values"][0] == line:
-                    self.breakpoints_tree.delete(item)
-                    break
+            row = self._bp_rows.pop(line, None)
+            if row is not None:
+                self.breakpoints_tree.delete(row)
                     
             self.update_breakpoint_indicators()
                     
             # Send updated breakpoints to the debug adapter
             if self.dap_client and self.dap_client.is_initialized:
-                self.sync_breakpoints()
+                self._schedule_breakpoint_sync()
 
+    def _schedule_breakpoint_sync(self):
+        # Several toggles in a row are sent as one setBreakpoints once Tk
+        # is idle.
+        if not self._bp_sync_scheduled:
+            self._bp_sync_scheduled = True
+            self.root.after_idle(self._flush_breakpoint_sync)
+            
+    def _flush_breakpoint_sync(self):
+        self._bp_sync_scheduled = False
+        self.sync_breakpoints()
+        
     def sync_breakpoints(self):
         # Only send breakpoints if the adapter process is still running and
         # the DAP client has successfully initialized.
@@ -385,7 +516,7 @@ class DAPEditor:
             and self.dap_client.is_initialized
             and self.current_file
             and self.io_handler
-            and self.io_handler.is_running()
+            and self.io_handler.alive
         ):
             return
         
@@ -393,11 +524,19 @@ class DAPEditor:
             # Nothing to sync
             return
         
+        # The adapter already has, or is being sent, exactly these breakpoints.
+        sync = (self.current_file, self._bp_version)
+        if sync == self._synced_bp or any(pending == sync for pending, _ in self._bp_syncs.values()):
+            return
+        
         source = {"path": self.current_file}
         # DAP `setBreakpoints` replaces all breakpoints for a source,
         # so we must always send the full list.
-        breakpoints = [{"line": line} for line in sorted(self.breakpoints.keys())]
-        self.send_dap_request("setBreakpoints", {"source": source, "breakpoints": breakpoints})
+        lines = list(self._sorted_bp_lines)
+        breakpoints = [{"line": line} for line in lines]
+        seq = self.send_dap_request("setBreakpoints", {"source": source, "breakpoints": breakpoints})
+        if seq is not None:
+            self._bp_syncs[seq] = (sync, lines)
                 
     def new_file(self):
         self.current_file = None
@@ -411,52 +550,102 @@ class DAPEditor:
             filetypes=[("Python files", "*.py"), ("All files", "*.*")]
         )
         if filename:
-            try:
-                with open(filename, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                self.editor.delete(1.0, tk.END)
-                self.editor.insert(1.0, content)
+            self.status_label.config(text=f"Opening: {os.path.basename(filename)}...")
+            
+            def opened(content, error):
+                if error is not None:
+                    messagebox.showerror("Error", f"Failed to open file: {error}")
+                    return
+                self.load_editor_content(content)
                 self.current_file = filename
-                self.update_line_numbers()
                 self.status_label.config(text=f"Opened: {os.path.basename(filename)}")
-            except Exception as e:
-                messagebox.showerror("Error", f"Failed to open file: {e}")
                 
-    def save_file(self):
+            self._run_file_io(self._read_file, (filename,), opened)
+            
+    def load_editor_content(self, content):
+        # Loading replaces the document, so it is kept out of the undo
+        # history, which also spares recording the whole file as one edit.
+        self.editor.config(undo=False)
+        self.editor.delete(1.0, tk.END)
+        self.editor.insert(1.0, content)
+        self.editor.edit_reset()
+        self.editor.config(undo=True)
+        # The gutter is updated directly below, so the pending <<Modified>>
+        # from the insert is cleared rather than scheduling another update.
+        self.editor.edit_modified(False)
+        self.update_line_numbers()
+        
+    def save_file(self, on_saved=None):
         if self.current_file:
-            try:
-                content = self.editor.get(1.0, tk.END)
-                with open(self.current_file, 'w', encoding='utf-8') as f:
-                    f.write(content)
-                self.status_label.config(text=f"Saved: {os.path.basename(self.current_file)}")
-            except Exception as e:
-                messagebox.showerror("Error", f"Failed to save file: {e}")
+            self._write_editor_to(self.current_file, on_saved)
         else:
-            self.save_as_file()
+            self.save_as_file(on_saved)
             
-    def save_as_file(self):
+    def save_as_file(self, on_saved=None):
         filename = filedialog.asksaveasfilename(
             title="Save As",
             defaultextension=".py",
             filetypes=[("Python files", "*.py"), ("All files", "*.*")]
         )
         if filename:
+            self._write_editor_to(filename, on_saved)
+            
+    def _write_editor_to(self, filename, on_saved=None):
+        # The text is read here, on the Tk thread; only the write is offloaded.
+        content = self.editor.get(1.0, tk.END)
+        self.status_label.config(text="Saving...")
+        
+        def saved(result, error):
+            if error is not None:
+                messagebox.showerror("Error", f"Failed to save file: {error}")
+                return
+            self.current_file = filename
+            self.status_label.config(text=f"Saved: {os.path.basename(filename)}")
+            if on_saved:
+                on_saved()
+                
+        self._run_file_io(self._write_file, (filename, content), saved)
+        
+    @staticmethod
+    def _read_file(filename):
+        with open(filename, 'r', encoding='utf-8') as f:
+            return f.read()
+            
+    @staticmethod
+    def _write_file(filename, content):
+        with open(filename, 'w', encoding='utf-8') as f:
+            f.write(content)
+            
+    def _run_file_io(self, work, args, done):
+        # File access runs on a worker thread so large files do not freeze
+        # the UI; `done(result, error)` is then called on the Tk thread.
+        def worker():
             try:
-                content = self.editor.get(1.0, tk.END)
-                with open(filename, 'w', encoding='utf-8') as f:
-                    f.write(content)
-                self.current_file = filename
-                self.status_label.config(text=f"Saved: {os.path.basename(filename)}")
+                result, error = work(*args), None
             except Exception as e:
-                messagebox.showerror("Error", f"Failed to save file: {e}")
+                result, error = None, e
+            self._io_results.put((done, result, error))
+            self.root.event_generate("<<FileIODone>>", when="tail")
+            
+        threading.Thread(target=worker, daemon=True).start()
+        
+    def _process_io_results(self):
+        try:
+            while True:
+                done, result, error = self._io_results.get_nowait()
+                done(result, error)
+        except queue.Empty:
+            pass
                 
     def start_debugging(self):
         if not self.current_file:
             messagebox.showwarning("Warning", "Please open a file to debug")
             return
             
-        self.save_file()
-            
+        # The session starts once the file is on disk.
+        self.save_file(on_saved=self._start_debug_session)
+        
+    def _start_debug_session(self):
         self.session_started = False
 
         debug_adapter_cmd = f"{sys.executable} -m debugpy.adapter"
@@ -481,16 +670,15 @@ class DAPEditor:
             
             self.io_handler.start()
             
-            time.sleep(0.5)
+            # The reader is running before initialize goes out, so the
+            # response is picked up as soon as it arrives; the `initialized`
+            # event then drives launch and configurationDone.
+            threading.Thread(target=self.read_dap_responses, daemon=True).start()
             
             init_data = self.dap_client.send()
             self.io_handler.write(init_data)
             self.log_output("Sent initialize request")
             
-            time.sleep(0.5)
-            
-            threading.Thread(target=self.read_dap_responses, daemon=True).start()
-            
             # Update UI
             self.start_debug_btn.config(state=tk.DISABLED)
             self.stop_debug_btn.config(state=tk.NORMAL)
@@ -533,36 +721,233 @@ class DAPEditor:
         self.is_debugging = False
         self.session_started = False
         self.current_thread_id = None
+        self._synced_bp = None
+        self._bp_syncs.clear()
         self.variables = {}
         self.stack_frames = []
+        self._invalidate_stop_state()
+        self._stack_cache.clear()
+        self._scopes_cache.clear()
+        self._variables_cache.clear()
         
         # Update UI
         self.reset_debug_ui()
         
         # Clear debug panels
         self.variables_tree.delete(*self.variables_tree.get_children())
+        self._var_refs.clear()
+        self._var_rows.clear()
+        self._var_placeholders.clear()
+        self._pending_variables.clear()
         self.stack_listbox.delete(0, tk.END)
         
         self.log_output("Debug session stopped")
         
     def continue_execution(self):
         if self.dap_client and self.dap_client.is_initialized:
+            self._invalidate_stop_state()
             self.send_dap_request("continue", {"threadId": self.current_thread_id})
             self.debug_status_label.config(text="Running")
             
     def step_over(self):
         if self.dap_client and self.dap_client.is_initialized:
+            self._invalidate_stop_state()
             self.send_dap_request("next", {"threadId": self.current_thread_id})
             
     def step_into(self):
         if self.dap_client and self.dap_client.is_initialized:
+            self._invalidate_stop_state()
             self.send_dap_request("stepIn", {"threadId": self.current_thread_id})
             
     def step_out(self):
         if self.dap_client and self.dap_client.is_initialized:
+            self._invalidate_stop_state()
             self.send_dap_request("stepOut", {"threadId": self.current_thread_id})
             
+    def _invalidate_stop_state(self):
+        # Not cleared here: stale entries are simply never matched again and
+        # get overwritten by the next stop's results.
+        self._stop_generation += 1
+        
+    def _cached(self, cache, key):
+        entry = cache.get(key)
+        if entry is not None and entry[0] == self._stop_generation:
+            return entry[1]
+        return None
+        
+    def _store(self, cache, pending, result):
+        # Results of requests sent before the debuggee resumed are dropped.
+        if pending is not None and pending[1] == self._stop_generation:
+            cache[pending[0]] = (pending[1], result)
+            
+    def request_stack_trace(self, thread_id):
+        frames = self._cached(self._stack_cache, thread_id)
+        if frames is not None:
+            self.show_stack_frames(frames)
+            return
+        self._pending_stack = (thread_id, self._stop_generation)
+        self.send_dap_request("stackTrace", {"threadId": thread_id})
+        
+    def request_scopes(self, frame_id):
+        scopes = self._cached(self._scopes_cache, frame_id)
+        if scopes is not None:
+            self.show_scopes(scopes)
+            return
+        self._pending_scopes = (frame_id, self._stop_generation)
+        self.send_dap_request("scopes", {"frameId": frame_id})
+        
+    def request_variables(self, variables_reference, parent):
+        variables = self._cached(self._variables_cache, variables_reference)
+        if variables is not None:
+            self._var_refs.pop(parent, None)
+            self.show_variables(parent, variables)
+            return
+        # Several nodes can be expanded before their responses arrive, so
+        # each response is matched to its tree item by request seq.
+        seq = self.send_dap_request("variables", {"variablesReference": variables_reference})
+        if seq is not None:
+            self._pending_variables[seq] = (variables_reference, self._stop_generation, parent)
+        
+    def show_stack_frames(self, stack_frames):
+        # A cache hit for the stack already on screen has nothing to redraw,
+        # and its scopes and variables are already shown too.
+        if stack_frames is self.stack_frames:
+            return
+        self.stack_frames = stack_frames
+        # Frames of a deep stack mostly share a few files.
+        file_names = {}
+        rows = []
+        for frame in stack_frames:
+            name = frame.get("name", "?")
+            line = frame.get("line", "?")
+            file_info = frame.get("source", {}).get("path", "?")
+            file_name = file_names.get(file_info)
+            if file_name is None:
+                file_name = file_names[file_info] = os.path.basename(file_info)
+            rows.append(f"{name} ({file_name}:{line})")
+        # All rows go to Tk in one call.
+        self.stack_listbox.delete(0, tk.END)
+        if rows:
+            self.stack_listbox.insert(tk.END, *rows)
+        
+        # Automatically request scopes for the top stack frame
+        if stack_frames:
+            top_frame_id = stack_frames[0].get("id")
+            if top_frame_id is not None:
+                self.request_scopes(top_frame_id)
+                
+    def show_scopes(self, scopes):
+        # Each scope gets a collapsed node; variables are only fetched when
+        # a node is expanded. The first scope (usually "Locals") is opened
+        # the first time it appears.
+        entries = [(scope.get("name", "?"), ("", ""), scope.get("variablesReference")) for scope in scopes]
+        added = self._sync_variable_rows("", entries)
+        items = self.variables_tree.get_children()
+        if items and items[0] in added:
+            self.variables_tree.item(items[0], open=True)
+            self._load_variable_children(items[0])
+            
+    def _sync_variable_rows(self, parent, entries):
+        # Rows are matched to the previous stop's by name, so only new,
+        # removed, moved or changed rows touch Tk. Returns the new items.
+        tree = self.variables_tree
+        placeholder = self._var_placeholders.pop(parent, None)
+        if placeholder is not None:
+            tree.delete(placeholder)
+        old_rows = self._var_rows.get(parent, {})
+        # Rows that are gone are deleted first, so that below, `index` is
+        # both the row's final position and its position in the tree.
+        names = {name for name, _, _ in entries}
+        for name in [name for name in old_rows if name not in names]:
+            item, _ = old_rows.pop(name)
+            self._forget_variable_item(item)
+            tree.delete(item)
+        # The tree now holds the rows placed so far, then the remaining
+        # reused rows in their old order; `kept[cursor]` is the first of
+        # those, i.e. the row currently at `index`.
+        kept = list(old_rows)
+        cursor = 0
+        rows = {}
+        added = set()
+        for index, (name, values, variables_reference) in enumerate(entries):
+            row = old_rows.pop(name, None)
+            if row is None:
+                item = tree.insert(parent, index, text=name, values=values)
+                added.add(item)
+            else:
+                item, old_values = row
+                if values != old_values:
+                    tree.item(item, values=values)
+                # Skip rows that were already moved into place.
+                while cursor < len(kept) and kept[cursor] != name and kept[cursor] not in old_rows:
+                    cursor += 1
+                if cursor < len(kept) and kept[cursor] == name:
+                    cursor += 1
+                else:
+                    tree.move(item, parent, index)
+            rows[name] = (item, values)
+            self._set_variables_reference(item, variables_reference, row is None)
+        self._var_rows[parent] = rows
+        return added
+        
+    def _set_variables_reference(self, item, variables_reference, new=False):
+        # References are only valid for the current stop, so a reused row's
+        # children are fetched again: right away if it is open, otherwise
+        # when next opened. A row inserted just now has no children and is
+        # closed, so it skips those Tk round trips.
+        if new:
+            if variables_reference:
+                self._var_refs[item] = variables_reference
+                self._var_placeholders[item] = self.variables_tree.insert(item, tk.END, text="")
+            return
+        if not variables_reference:
+            self._var_refs.pop(item, None)
+            for child in self.variables_tree.get_children(item):
+                self._forget_variable_item(child)
+            self._var_rows.pop(item, None)
+            self._var_placeholders.pop(item, None)
+            self.variables_tree.delete(*self.variables_tree.get_children(item))
+            return
+        self._var_refs[item] = variables_reference
+        if item not in self._var_rows and item not in self._var_placeholders:
+            # Placeholder child so Tk shows the node as expandable.
+            self._var_placeholders[item] = self.variables_tree.insert(item, tk.END, text="")
+        if self.variables_tree.item(item, "open"):
+            self._load_variable_children(item)
+            
+    def _forget_variable_item(self, item):
+        self._var_refs.pop(item, None)
+        self._var_placeholders.pop(item, None)
+        for child, _ in self._var_rows.pop(item, {}).values():
+            self._forget_variable_item(child)
+        
+    def _on_var_open(self, event=None):
+        self._load_variable_children(self.variables_tree.focus())
+        
+    def _load_variable_children(self, item):
+        # The reference is only dropped once the children are shown, so a
+        # node is fetched the first time it is opened and again if that
+        # request failed, but not while a request from this stop is still
+        # in flight.
+        variables_reference = self._var_refs.get(item)
+        if variables_reference and not any(
+            pending[2] == item and pending[1] == self._stop_generation
+            for pending in self._pending_variables.values()
+        ):
+            self.request_variables(variables_reference, item)
+                
+    def show_variables(self, parent, variables):
+        # The node may be gone if the tree was rebuilt for a later stop.
+        if not self.variables_tree.exists(parent):
+            return
+        entries = [
+            (var.get("name", "?"), (var.get("value", "?"), var.get("type", "")), var.get("variablesReference"))
+            for var in variables
+        ]
+        self._sync_variable_rows(parent, entries)
+            
     def send_dap_request(self, method, params=None):
+        # Returns the request's seq, or None if it was not sent.
         if not (self.dap_client and self.io_handler):
             return
         
@@ -570,32 +955,32 @@ class DAPEditor:
         try:
             # Map generic method names to the high-level DAPClient API.
             if method == "configurationDone":
-                self.dap_client.configuration_done()
+                seq = self.dap_client.configuration_done()
             elif method == "launch":
                 # `launch` takes `program` plus any additional kwargs
-                self.dap_client.launch(**params)
+                seq = self.dap_client.launch(**params)
             elif method == "continue":
-                self.dap_client.continue_execution(threadId=params["threadId"])
+                seq = self.dap_client.continue_execution(threadId=params["threadId"])
             elif method == "next":
-                self.dap_client.next(threadId=params["threadId"])
+                seq = self.dap_client.next(threadId=params["threadId"])
             elif method == "stepIn":
-                self.dap_client.step_in(threadId=params["threadId"])
+                seq = self.dap_client.step_in(threadId=params["threadId"])
             elif method == "stepOut":
-                self.dap_client.step_out(threadId=params["threadId"])
+                seq = self.dap_client.step_out(threadId=params["threadId"])
             elif method == "stackTrace":
-                self.dap_client.stack_trace(**params)
+                seq = self.dap_client.stack_trace(**params)
             elif method == "scopes":
-                self.dap_client.scopes(**params)
+                seq = self.dap_client.scopes(**params)
             elif method == "setBreakpoints":
-                self.dap_client.set_breakpoints(
+                seq = self.dap_client.set_breakpoints(
                     source=params["source"],
                     breakpoints=params.get("breakpoints", []),
                 )
             elif method == "variables":
-                self.dap_client.variables(**params)
+                seq = self.dap_client.variables(**params)
             elif method == "disconnect":
                 # Ignore extra params like {"restart": False} for now.
-                self.dap_client.disconnect()
+                seq = self.dap_client.disconnect()
             else:
                 self.log_output(f"Unsupported DAP method: {method}")
                 return
@@ -605,211 +990,246 @@ class DAPEditor:
             if request_data:
                 self.io_handler.write(request_data)
             self.log_output(f"Sent: {method}")
+            return seq
         except Exception as e:
             self.log_output(f"Error sending {method}: {e}")
                 
     def read_dap_responses(self):
+        # `IO.read()` blocks until the adapter writes something and only
+        # returns nothing once its stdout is closed, which `IO.stop()` causes
+        # by terminating the adapter.
         while self.io_handler and self.io_handler.alive:
             try:
                 data = self.io_handler.read()
                 if data:
-                    self.log_output(f"Received {len(data)} bytes from debug adapter")
-                    self.log_output(f"Raw data: {data.decode('utf-8', errors='ignore')[:200]}")
+                    if self.debug_verbose:
+                        self.log_output(f"Received {len(data)} bytes from debug adapter")
+                        # Only the logged prefix is decoded.
+                        self.log_output(f"Raw data: {data[:200].decode('utf-8', errors='ignore')}")
                     # Process DAP events (only if the client is still active)
                     if not self.dap_client:
                         break
-                    events = list(self.dap_client.recv(data))
-                    self.log_output(f"Parsed {len(events)} events")
-                    for event in events:
-                        self.event_queue.put(event)
+                    count = self._receive_dap_data(data)
+                    if self.debug_verbose:
+                        self.log_output(f"Parsed {count} events")
                 else:
-                    # No data received, check if process is still alive
-                    if not self.io_handler.is_running():
-                        self.log_output("Debug adapter process terminated")
-                        break
-                    time.sleep(0.1)  # Small delay to prevent busy waiting
+                    self.log_output("Debug adapter process terminated")
+                    break
                         
             except Exception as e:
                 self.log_output(f"Error reading DAP responses: {e}")
                 break
                 
+    def _receive_dap_data(self, data):
+        # Each event is handed to the UI as soon as it is parsed rather than
+        # after the whole read has been. A bad message is logged and skipped
+        # so one malformed frame does not stop the reader; returns the number
+        # of events queued.
+        count = 0
+        while True:
+            try:
+                for event in self.dap_client.recv(data):
+                    self.event_queue.put(event)
+                    self.root.event_generate("<<DAPEvent>>", when="tail")
+                    count += 1
+                return count
+            except DAPFramingError as e:
+                # The client has already discarded its buffer.
+                self.log_output(f"Dropped unframeable data from debug adapter: {e}")
+                return count
+            except ValidationError as e:
+                # Only the invalid frame was consumed; parse any that
+                # followed it in the same read.
+                self.log_output(f"Skipped invalid DAP message: {e}")
+                data = b""
+                
     def process_dap_events(self):
+        # Handle everything queued so far; several notifications may have
+        # been coalesced into this one.
         try:
             while True:
                 event = self.event_queue.get_nowait()
                 self.handle_dap_event(event)
         except queue.Empty:
             pass
-            
-        # Schedule next check
-        self.root.after(100, self.process_dap_events)
         
     def handle_dap_event(self, event):
         self.log_output(f"Received DAP event: {type(event).__name__}")
-        self.log_output(f"Event details: {event}")
+        if self.debug_verbose:
+            self.log_output(f"Event details: {event}")
         
         # Many events come through as the generic Event type with an `event`
-        # string and a `body` dict. For robustness we branch primarily on the
-        # event name instead of the concrete Python class.
-        event_kind = getattr(event, "event", None)
-        body = getattr(event, "body", {}) or {}
-        
-        if event_kind == "initialized":
-            # This covers both the synthetic InitializedEvent we emit after a
-            # successful initialize response and any raw "initialized" events
-            # coming from the adapter.
-            # We MUST only react once; debugpy will error if we send multiple
-            # launch/configurationDone sequences for the same session.
-            if self.session_started:
-                self.log_output("Ignoring duplicate 'initialized' event")
-                return
-            self.session_started = True
-            self.log_output("Debug adapter initialized!")
-            self.debug_status_label.config(text="Debug Session Active")
-            self.is_debugging = True
-            
-            # Cancel timeout
-            if self.initialization_timeout:
-                self.root.after_cancel(self.initialization_timeout)
-                self.initialization_timeout = None
-            
-            # Start debugging: launch then configurationDone. We use the
-            # internal console and stop on entry so we can install user
-            # breakpoints once the debug server is fully running.
-            self.send_dap_request(
-                "launch",
-                {
-                    "program": self.current_file,
-                    "console": "internalConsole",
-                    "stopOnEntry": True,
-                },
-            )
-            self.send_dap_request("configurationDone")
-            
-        elif event_kind == "stopped":
-            # Hit a breakpoint, step, or entry stop.
-            self.debug_status_label.config(text="Stopped")
-            self.continue_btn.config(state=tk.NORMAL)
-            self.step_over_btn.config(state=tk.NORMAL)
-            self.step_into_btn.config(state=tk.NORMAL)
-            self.step_out_btn.config(state=tk.NORMAL)
-            
-            # Update thread ID
-            thread_id = body.get("threadId")
-            if thread_id is not None:
-                self.current_thread_id = thread_id
-
-            # Now that execution is stopped inside the debuggee, (re)send all
-            # user breakpoints so they become active for subsequent execution.
-            self.sync_breakpoints()
-                
-            # Request stack trace
-            if self.current_thread_id:
-                self.send_dap_request("stackTrace", {"threadId": self.current_thread_id})
+        # string and a `body` dict. For robustness we dispatch on the event
+        # name instead of the concrete Python class; events without a handler
+        # are ignored. Failed requests come back as an `ErrorResponse` rather
+        # than as a "response" event.
+        if isinstance(event, ErrorResponse):
+            self._on_error_response(event.command, event.request_seq, event.message)
+            return
+        handler = self._event_handlers.get(getattr(event, "event", None))
+        if handler is not None:
+            handler(event.body or {})
             
-        elif event_kind == "continued":
-            self.debug_status_label.config(text="Running")
-            self.continue_btn.config(state=tk.DISABLED)
-            self.step_over_btn.config(state=tk.DISABLED)
-            self.step_into_btn.config(state=tk.DISABLED)
-            self.step_out_btn.config(state=tk.DISABLED)
-            
-        elif event_kind == "output":
-            output_text = body.get("output", "")
-            if output_text:
-                self.log_output(f"Program output: {output_text}")
-            
-        elif event_kind == "exited":
-            exit_code = body.get("exitCode")
-            if exit_code is not None:
-                self.log_output(f"Program exited with code: {exit_code}")
-            else:
-                self.log_output("Program exited")
-            self.stop_debugging()
-            
-        elif event_kind == "response":
-            # Handle responses to requests we sent
-            command = body.get("command")
-            if not body.get("success"):
-                message = body.get("message", "Unknown error")
-                self.log_output(f"Error in response to {command}: {message}")
-                return
-
-            response_body = body.get("body", {}) or {}
-            
-            if command == "stackTrace":
-                stack_frames = response_body.get("stackFrames", [])
-                self.stack_frames = stack_frames
-                self.stack_listbox.delete(0, tk.END)
-                for frame in stack_frames:
-                    name = frame.get("name", "?")
-                    line = frame.get("line", "?")
-                    file_info = frame.get("source", {}).get("path", "?")
-                    file_name = os.path.basename(file_info)
-                    self.stack_listbox.insert(tk.END, f"{name} ({file_name}:{line})")
-                
-                # Automatically request scopes for the top stack frame
-                if stack_frames:
-                    top_frame_id = stack_frames[0].get("id")
-                    if top_frame_id is not None:
-                        self.send_dap_request("scopes", {"frameId": top_frame_id})
-                    
-            elif command == "scopes":
-                scopes = response_body.get("scopes", [])
-                if scopes:
-                    # For simplicity, just get variables for the first scope (usually "Locals")
-                    first_scope = scopes[0]
-                    var_ref = first_scope.get("variablesReference")
-                    if var_ref:
-                        self.send_dap_request("variables", {"variablesReference": var_ref})
-                        
-            elif command == "variables":
-                variables = response_body.get("variables", [])
-                # Update variables tree
-                # Clear existing items if this is a fresh update (naive implementation)
-                # Ideally we would update specific nodes, but for this demo we just show the list.
-                # Since we only request one scope's variables, clearing everything is "okay" for a simple view.
-                self.variables_tree.delete(*self.variables_tree.get_children())
-                for var in variables:
-                    name = var.get("name", "?")
-                    value = var.get("value", "?")
-                    type_name = var.get("type", "")
-                    self.variables_tree.insert("", tk.END, text=name, values=(value, type_name))
-            
-            elif command == "setBreakpoints":
-                # Update breakpoint status
-                breakpoints = response_body.get("breakpoints", [])
-                # We need to map these back to our line numbers.
-                # The response order matches the request order.
-                # In sync_breakpoints, we sorted keys: existing_lines = sorted(self.breakpoints.keys())
-                
-                existing_lines = sorted(self.breakpoints.keys())
-                for i, bp_resp in enumerate(breakpoints):
-                    if i < len(existing_lines):
-                        line = existing_lines[i]
-                        verified = bp_resp.get("verified", False)
-                        msg = "Verified" if verified else "Unverified"
-                        
-                        # Update internal state
-                        if line in self.breakpoints:
-                            self.breakpoints[line]["verified"] = verified
-                        
-                        # Update UI
-                        for item in self.breakpoints_tree.get_children():
-                            if self.breakpoints_tree.item(item)["values"][0] == line:
-                                self.breakpoints_tree.item(item, values=(line, msg))
-                                break
-                        
-                        # Redraw canvas indicator if verified
-                        # (Optimally we could change color, but for now just ensured it stays)
+    def _on_initialized(self, body):
+        # This covers both the synthetic InitializedEvent we emit after a
+        # successful initialize response and any raw "initialized" events
+        # coming from the adapter.
+        # We MUST only react once; debugpy will error if we send multiple
+        # launch/configurationDone sequences for the same session.
+        if self.session_started:
+            self.log_output("Ignoring duplicate 'initialized' event")
+            return
+        self.session_started = True
+        self.log_output("Debug adapter initialized!")
+        self.debug_status_label.config(text="Debug Session Active")
+        self.is_debugging = True
+        
+        # Cancel timeout
+        if self.initialization_timeout:
+            self.root.after_cancel(self.initialization_timeout)
+            self.initialization_timeout = None
+        
+        # Start debugging: launch then configurationDone. We use the
+        # internal console and stop on entry so we can install user
+        # breakpoints once the debug server is fully running.
+        self.send_dap_request(
+            "launch",
+            {
+                "program": self.current_file,
+                "console": "internalConsole",
+                "stopOnEntry": True,
+            },
+        )
+        self.send_dap_request("configurationDone")
+        
+    def _on_stopped(self, body):
+        # Hit a breakpoint, step, or entry stop.
+        self.debug_status_label.config(text="Stopped")
+        self.continue_btn.config(state=tk.NORMAL)
+        self.step_over_btn.config(state=tk.NORMAL)
+        self.step_into_btn.config(state=tk.NORMAL)
+        self.step_out_btn.config(state=tk.NORMAL)
+        
+        # Update thread ID
+        thread_id = body.get("threadId")
+        if thread_id is not None:
+            self.current_thread_id = thread_id
 
-        elif event_kind == "terminated":
-            self.log_output("Debug session terminated")
-            self.stop_debugging()
+        # Now that execution is stopped inside the debuggee, (re)send all
+        # user breakpoints so they become active for subsequent execution.
+        self.sync_breakpoints()
+            
+        # Request stack trace
+        if self.current_thread_id:
+            self.request_stack_trace(self.current_thread_id)
+        
+    def _on_continued(self, body):
+        self._invalidate_stop_state()
+        self.debug_status_label.config(text="Running")
+        self.continue_btn.config(state=tk.DISABLED)
+        self.step_over_btn.config(state=tk.DISABLED)
+        self.step_into_btn.config(state=tk.DISABLED)
+        self.step_out_btn.config(state=tk.DISABLED)
+        
+    def _on_output(self, body):
+        output_text = body.get("output", "")
+        if output_text:
+            self.log_output(f"Program output: {output_text}")
+        
+    def _on_exited(self, body):
+        self._invalidate_stop_state()
+        exit_code = body.get("exitCode")
+        if exit_code is not None:
+            self.log_output(f"Program exited with code: {exit_code}")
+        else:
+            self.log_output("Program exited")
+        self.stop_debugging()
+        
+    def _on_terminated(self, body):
+        self.log_output("Debug session terminated")
+        self.stop_debugging()
+        
+    def _on_response(self, body):
+        # Handle successful responses to requests we sent
+        handler = self._response_handlers.get(body.get("command"))
+        if handler is not None:
+            handler(body.get("body", {}) or {}, body.get("request_seq"))
+            
+    def _on_error_response(self, command, request_seq, message):
+        self.log_output(f"Error in response to {command}: {message or 'Unknown error'}")
+        if command == "setBreakpoints":
+            # No longer in flight, so the next sync retries.
+            self._bp_syncs.pop(request_seq, None)
+        elif command == "variables":
+            # The node keeps its reference, so expanding it again refetches.
+            self._pending_variables.pop(request_seq, None)
+            
+    def _on_stack_trace_response(self, response_body, request_seq):
+        stack_frames = response_body.get("stackFrames", [])
+        self._store(self._stack_cache, self._pending_stack, stack_frames)
+        self.show_stack_frames(stack_frames)
+        
+    def _on_scopes_response(self, response_body, request_seq):
+        scopes = response_body.get("scopes", [])
+        self._store(self._scopes_cache, self._pending_scopes, scopes)
+        self.show_scopes(scopes)
+        
+    def _on_variables_response(self, response_body, request_seq):
+        pending = self._pending_variables.pop(request_seq, None)
+        if pending is None:
+            return
+        variables_reference, generation, parent = pending
+        variables = response_body.get("variables", [])
+        self._store(self._variables_cache, pending, variables)
+        # A later stop may already have given the node a new reference.
+        if generation == self._stop_generation and self._var_refs.get(parent) == variables_reference:
+            del self._var_refs[parent]
+        self.show_variables(parent, variables)
+        
+    def _on_set_breakpoints_response(self, response_body, request_seq):
+        # Update breakpoint status
+        pending = self._bp_syncs.pop(request_seq, None)
+        if pending is None:
+            return
+        sync, lines = pending
+        self._synced_bp = sync
+        
+        # The response order matches this request's order, so pair each
+        # result with the line it was sent for, even if breakpoints have
+        # changed (and been sent again) since.
+        breakpoints = response_body.get("breakpoints", [])
+        for line, bp_resp in zip(lines, breakpoints):
+            verified = bp_resp.get("verified", False)
+            bp = self.breakpoints.get(line)
+            # Every sync resends all lines; only rows whose status changed
+            # need to touch the tree.
+            if bp is None or bp["verified"] == verified:
+                continue
+            bp["verified"] = verified
+            
+            msg = "Verified" if verified else "Unverified"
+            row = self._bp_rows.get(line)
+            if row is not None:
+                self.breakpoints_tree.item(row, values=(line, msg))
             
     def log_output(self, message):
+        self._log_buf.append(f"{message}\n")
+        if not self._log_flush_pending:
+            self._log_flush_pending = True
+            self.root.after_idle(self._flush_log)
+            
+    def _flush_log(self):
+        # Cleared before draining, so a line logged by the reader thread
+        # meanwhile schedules another flush instead of being left behind.
+        self._log_flush_pending = False
+        lines = []
+        while self._log_buf:
+            lines.append(self._log_buf.popleft())
+        if not lines:
+            return
         self.output_text.config(state=tk.NORMAL)
-        self.output_text.insert(tk.END, f"{message}\n")
+        self.output_text.insert(tk.END, "".join(lines))
+        self.output_text.delete("1.0", f"end-{self.MAX_LOG_LINES + 1}l")
         self.output_text.see(tk.END)
         self.output_text.config(state=tk.DISABLED)
         
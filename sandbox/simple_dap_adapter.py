@@ -7,10 +7,50 @@ This creates a minimal DAP adapter that can communicate via stdin/stdout.
 
 import sys
 import json
+import logging
 import threading
 import time
 from typing import Dict, Any
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if orjson is not None:
+    _dumps = orjson.dumps
+    _loads = orjson.loads
+else:
+    def _dumps(obj: Any) -> bytes:
+        return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+    _loads = json.loads
+
+logger = logging.getLogger("adapter")
+
+CONTENT_LENGTH = b"Content-Length:"
+HEADER_PREFIX = CONTENT_LENGTH + b" "
+HEADER_SEP = b"\r\n\r\n"
+
+_INIT_CAPABILITIES = {
+    "supportsConfigurationDoneRequest": True,
+    "supportsConditionalBreakpoints": True,
+    "supportsHitConditionalBreakpoints": True,
+    "supportsLogPoints": True,
+    "supportsSetVariable": True,
+    "supportsSetExpression": True,
+    "supportsTerminateRequest": True,
+    "supportsRestartRequest": True,
+    "supportsCompletionsRequest": True,
+    "supportsModulesRequest": True,
+    "supportsReadMemoryRequest": True,
+    "supportsWriteMemoryRequest": True,
+    "supportsDisassembleRequest": True,
+    "supportsCancelRequest": True,
+    "supportsBreakpointLocationsRequest": True,
+    "supportsDataBreakpoints": True,
+}
+
 class SimpleDAPAdapter:
     def __init__(self):
         self.seq = 1
@@ -21,50 +61,22 @@ class SimpleDAPAdapter:
         message["seq"] = self.seq
         self.seq += 1
         
-        content = json.dumps(message)
-        header = f"Content-Length: {len(content)}\r\n\r\n"
+        content = _dumps(message)
+        frame = b"".join((HEADER_PREFIX, b"%d" % len(content), HEADER_SEP, content))
         
-        sys.stdout.write(header + content)
-        sys.stdout.flush()
+        sys.stdout.buffer.write(frame)
+        sys.stdout.buffer.flush()
         
     def handle_initialize(self, args: Dict[str, Any]):
         """Handle initialize request."""
-        print(f"[ADAPTER] Initialize request: {args}", file=sys.stderr)
+        logger.debug("Initialize request: %s", args)
         
         response = {
             "type": "response",
             "request_seq": args.get("seq", 1),
             "command": "initialize",
             "success": True,
-            "body": {
-                "supportsConfigurationDoneRequest": True,
-                "supportsConditionalBreakpoints": True,
-                "supportsHitConditionalBreakpoints": True,
-                "supportsLogPoints": True,
-                "supportsSetVariable": True,
-                "supportsSetExpression": True,
-                "supportsTerminateRequest": True,
-                "supportsRestartRequest": True,
-                "supportsCompletionsRequest": True,
-                "supportsModulesRequest": True,
-                "supportsReadMemoryRequest": True,
-                "supportsWriteMemoryRequest": True,
-                "supportsDisassembleRequest": True,
-                "supportsCancelRequest": True,
-                "supportsBreakpointLocationsRequest": True,
-                "supportsLogPoints": True,
-                "supportsDataBreakpoints": True,
-                "supportsSetExpression": True,
-                "supportsTerminateRequest": True,
-                "supportsRestartRequest": True,
-                "supportsCompletionsRequest": True,
-                "supportsModulesRequest": True,
-                "supportsReadMemoryRequest": True,
-                "supportsWriteMemoryRequest": True,
-                "supportsDisassembleRequest": True,
-                "supportsCancelRequest": True,
-                "supportsBreakpointLocationsRequest": True
-            }
+            "body": _INIT_CAPABILITIES,
         }
         self.send_message(response)
         
@@ -76,7 +88,7 @@ class SimpleDAPAdapter:
         
     def handle_configuration_done(self, args: Dict[str, Any]):
         """Handle configurationDone request."""
-        print(f"[ADAPTER] Configuration done request: {args}", file=sys.stderr)
+        logger.debug("Configuration done request: %s", args)
         
         response = {
             "type": "response",
@@ -88,7 +100,7 @@ class SimpleDAPAdapter:
         
     def handle_launch(self, args: Dict[str, Any]):
         """Handle launch request."""
-        print(f"[ADAPTER] Launch request: {args}", file=sys.stderr)
+        logger.debug("Launch request: %s", args)
         
         response = {
             "type": "response",
@@ -111,22 +123,26 @@ class SimpleDAPAdapter:
         
     def run(self):
         """Main loop to handle DAP messages."""
-        print("[ADAPTER] Simple DAP adapter started", file=sys.stderr)
+        logger.info("Simple DAP adapter started")
         
+        # Content-Length counts bytes, so read the binary stream and hand the
+        # raw body to the JSON parser.
+        stdin = sys.stdin.buffer
         while self.running:
             try:
-                line = sys.stdin.readline()
+                line = stdin.readline()
                 if not line:
                     break
                     
-                if line.startswith("Content-Length:"):
-                    length = int(line.split(":")[1].strip())
-                    sys.stdin.readline()
-                    content = sys.stdin.read(length)
+                if line.startswith(CONTENT_LENGTH):
+                    # int() ignores the surrounding space and CRLF.
+                    length = int(line[len(CONTENT_LENGTH):])
+                    stdin.readline()
+                    content = stdin.read(length)
                     
                     try:
-                        message = json.loads(content)
-                        print(f"[ADAPTER] Received message: {message}", file=sys.stderr)
+                        message = _loads(content)
+                        logger.debug("Received message: %s", message)
                         
                         if message.get("type") == "request":
                             command = message.get("command")
@@ -139,18 +155,19 @@ class SimpleDAPAdapter:
                             elif command == "launch":
                                 self.handle_launch(message)
                             else:
-                                print(f"[ADAPTER] Unknown command: {command}", file=sys.stderr)
+                                logger.warning("Unknown command: %s", command)
                                 
                     except json.JSONDecodeError as e:
-                        print(f"[ADAPTER] JSON decode error: {e}", file=sys.stderr)
+                        logger.error("JSON decode error: %s", e)
                         
             except Exception as e:
-                print(f"[ADAPTER] Error: {e}", file=sys.stderr)
+                logger.exception("Error: %s", e)
                 break
                 
-        print("[ADAPTER] Simple DAP adapter stopped", file=sys.stderr)
+        logger.info("Simple DAP adapter stopped")
 
 if __name__ == "__main__":
+    logging.basicConfig(stream=sys.stderr, level=logging.INFO, format="[ADAPTER] %(message)s")
     adapter = SimpleDAPAdapter()
     adapter.run()
 
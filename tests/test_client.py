@@ -57,7 +57,6 @@ def test_full_lifecycle():
     response_bytes = _make_response_bytes(seq=2, request_seq=1, command="launch")
     events = list(client.recv(response_bytes))
     
-    print(f"Launch response event: {events[0]}")
     assert events[0].event == "response"
     assert events[0].body["command"] == "launch"
     
@@ -87,13 +86,9 @@ def test_full_lifecycle():
     client.send()
     # Expect seq 4
     
-    print(f"Unanswered requests before disconnect response: {client._unanswered_requests}")
-    
     response_bytes = _make_response_bytes(seq=6, request_seq=4, command="disconnect")
     events = list(client.recv(response_bytes))
     
-    print(f"Disconnect events: {events}")
-    
     assert len(events) == 1
     assert isinstance(events[0], TerminatedEvent) or events[0].event == "terminated"
 
@@ -109,6 +104,30 @@ def test_unsolicited_events():
     assert events[0].event == "output"
     assert events[0].body["output"] == "Hello World\n"
 
+def test_error_response():
+    """Test failed responses are surfaced as ErrorResponse with a structured error."""
+    from dap.protocol import ErrorResponse
+
+    client = DAPClient()
+    client.send()
+    
+    content = {
+        "type": "response",
+        "seq": 1,
+        "request_seq": 0,
+        "command": "initialize",
+        "success": False,
+        "message": "notStopped",
+        "body": {"error": {"id": 7, "format": "Not stopped"}},
+    }
+    encoded = json.dumps(content).encode("utf-8")
+    events = list(client.recv(f"Content-Length: {len(encoded)}\r\n\r\n".encode("utf-8") + encoded))
+    
+    assert len(events) == 1
+    assert isinstance(events[0], ErrorResponse)
+    assert events[0].message == "notStopped"
+    assert events[0].error.id == 7
+
 def test_request_methods():
     """Test helper methods for sending requests."""
     client = DAPClient()
@@ -117,5 +136,62 @@ def test_request_methods():
     
     client.next(threadId=1)
     req = client.send()
-    assert b'"command": "next"' in req
-    assert b'"threadId": 1' in req
+    assert b'"command":"next"' in req
+    assert b'"threadId":1' in req
+
+def test_typed_arguments_omit_unset_fields():
+    """Test dap.types models can be passed as arguments and omit unset fields."""
+    from dap.types import Source, SourceBreakpoint
+
+    client = DAPClient()
+    client.send()
+    client._state = ClientState.NORMAL
+    
+    client.set_breakpoints(
+        source=Source(path="main.py"),
+        breakpoints=[SourceBreakpoint(line=3), {"line": 5, "condition": None}],
+    )
+    req = client.send()
+    assert b'"source":{"path":"main.py"}' in req
+    assert b'"breakpoints":[{"line":3},{"line":5,"condition":null}]' in req
+
+def test_build_request():
+    """Test requests are built as their typed class, validating only when untrusted."""
+    from pydantic import ValidationError
+    from dap.protocol import Request
+    from dap.requests import NextRequest, build_request, dispatch
+
+    assert dispatch("next") is NextRequest
+    assert dispatch("runInTerminal") is Request
+
+    request = build_request("next", {"seq": 3, "arguments": {"threadId": 1}})
+    assert isinstance(request, NextRequest)
+    assert request.arguments == {"threadId": 1}
+    
+    assert type(build_request("runInTerminal", {"seq": 4})) is Request
+    
+    request = build_request("next", {"seq": 5, "arguments": {"threadId": 1}}, untrusted=True)
+    assert isinstance(request, NextRequest)
+    assert type(build_request("runInTerminal", {"seq": 6}, untrusted=True)) is Request
+
+    with pytest.raises(ValidationError):
+        build_request("next", {"seq": "not a number"}, untrusted=True)
+
+def test_star_import_includes_lazy_modules():
+    """Test `from dap import *` still exports the request and data type models."""
+    import dap
+    import dap.requests
+    import dap.types
+
+    namespace = {}
+    exec("from dap import *", namespace)
+    assert namespace["Source"] is dap.types.Source
+    assert namespace["NextRequest"] is dap.requests.NextRequest
+    assert "DAPClient" in namespace
+    
+    # Every class and function defined by the lazy modules is listed.
+    for module in (dap.types, dap.requests):
+        for name, value in vars(module).items():
+            if not name.startswith("_") and getattr(value, "__module__", None) == module.__name__:
+                assert name in dap.__all__, name
+    assert {"Source", "NextRequest"} <= set(dir(dap))
@@ -1,10 +1,36 @@
 
+import asyncio
+import shlex
+import sys
+import threading
+import time
+from pathlib import Path
+
 import pytest
+from dap import _json
 from dap.client import DAPClient
 
+# The sandbox transport is a script module next to the editor.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "sandbox"))
+import dap_io
+
 def _wrap(body: bytes) -> bytes:
     return f"Content-Length: {len(body)}\r\n\r\n".encode("utf-8") + body
 
+def _writer_command(tmp_path, *chunks, delay=0.2):
+    """Command for a child that writes `chunks` to stdout with a pause between each."""
+    script = tmp_path / "writer.py"
+    script.write_text(
+        "import sys, time\n"
+        f"for i, chunk in enumerate({list(chunks)!r}):\n"
+        f"    if i: time.sleep({delay})\n"
+        "    sys.stdout.buffer.write(chunk)\n"
+        "    sys.stdout.buffer.flush()\n"
+    )
+    return f"{shlex.quote(sys.executable)} {shlex.quote(str(script))}"
+
+_STOPPED = b'{"seq": 1, "type": "event", "event": "stopped"}'
+
 def test_partial_messages():
     """Test parsing logic when messages arrive in chunks."""
     client = DAPClient()
@@ -25,6 +51,61 @@ def test_partial_messages():
     assert len(events) == 1
     assert events[0].event == "stopped"
 
+def test_partial_frames_across_chunks():
+    """Test frames split mid-payload across several chunks are all delivered."""
+    client = DAPClient()
+    
+    msg = _wrap(b'{"seq": 1, "type": "event", "event": "stopped"}')
+    msg += _wrap(b'{"seq": 2, "type": "event", "event": "continued"}')
+    
+    # Header complete, payload not: nothing yet.
+    assert list(client.recv(msg[:30])) == []
+    assert list(client.recv(msg[30:40])) == []
+    # Rest of the first frame plus part of the second.
+    events = list(client.recv(msg[40:90]))
+    assert [e.event for e in events] == ["stopped"]
+    events = list(client.recv(msg[90:]))
+    assert [e.event for e in events] == ["continued"]
+
+def test_many_partial_chunks():
+    """Test a large message fed in small chunks is buffered in linear time."""
+    client = DAPClient()
+    
+    variables = [
+        {"name": f"v{i}", "value": "x" * 40, "type": "str", "variablesReference": 0}
+        for i in range(12000)
+    ]
+    body = _json.encode({
+        "seq": 1, "type": "response", "request_seq": 1, "success": True,
+        "command": "variables", "body": {"variables": variables},
+    })
+    msg = _wrap(body)
+    assert len(msg) > 1 << 20
+    
+    events = []
+    start = time.perf_counter()
+    for i in range(0, len(msg), 16):
+        events.extend(client.recv(msg[i:i + 16]))
+    elapsed = time.perf_counter() - start
+    
+    assert len(events) == 1
+    assert len(events[0].body["body"]["variables"]) == 12000
+    # Linear buffering takes a fraction of a second; re-copying or rescanning
+    # the buffer on every chunk takes several.
+    assert elapsed < 2.0
+
+def test_recv_body():
+    """Test an already unframed payload is dispatched without buffering."""
+    client = DAPClient()
+    
+    events = list(client.recv_body(b'{"seq": 1, "type": "event", "event": "stopped"}'))
+    assert len(events) == 1
+    assert events[0].event == "stopped"
+    
+    # The framed path is unaffected.
+    events = list(client.recv(_wrap(b'{"seq": 2, "type": "event", "event": "continued"}')))
+    assert [e.event for e in events] == ["continued"]
+
 def test_multiple_messages_in_one_chunk():
     """Test parsing multiple messages arriving in a single buffer."""
     client = DAPClient()
@@ -41,6 +122,16 @@ def test_multiple_messages_in_one_chunk():
     assert events[0].event == "stopped"
     assert events[1].event == "initialized"
 
+def test_batch_message():
+    """Test a JSON array payload yields each message in order."""
+    client = DAPClient()
+    
+    body = b'[{"seq": 1, "type": "event", "event": "stopped"}, {"seq": 2, "type": "event", "event": "continued"}]'
+    
+    events = list(client.recv(_wrap(body)))
+    
+    assert [e.event for e in events] == ["stopped", "continued"]
+
 def test_extra_headers():
     """Test messages with extra headers like Content-Type are accepted."""
     client = DAPClient()
@@ -57,6 +148,27 @@ def test_extra_headers():
     assert len(events) == 1
     assert events[0].event == "stopped"
 
+def test_content_length_header_position_and_case():
+    """Test Content-Length is found regardless of header order or case."""
+    client = DAPClient()
+    
+    content = b'{"seq": 1, "type": "event", "event": "stopped"}'
+    msg = (
+        "X-Custom: length-agnostic\r\n"
+        f"content-length: {len(content)}\r\n"
+        "\r\n"
+    ).encode("utf-8") + content
+    
+    events = list(client.recv(msg))
+    assert len(events) == 1
+    assert events[0].event == "stopped"
+    
+    # Trailing whitespace after the length is tolerated.
+    msg = f"Content-Length: {len(content)} \t\r\n\r\n".encode("utf-8") + content
+    events = list(client.recv(msg))
+    assert len(events) == 1
+    assert events[0].event == "stopped"
+
 def test_utf8_encoding():
     """Test parsing utf-8 content with special characters."""
     client = DAPClient()
@@ -71,3 +183,149 @@ def test_utf8_encoding():
     events = list(client.recv(msg))
     assert len(events) == 1
     assert events[0].body["text"] == "héllo world 🐛"
+
+def test_templated_requests_match_generic_encoding():
+    """Test templated request bodies are identical to the generic encoder's."""
+    from dap.io_handler import _REQUEST_TEMPLATES, _encode_content, _make_templated_request
+
+    for command, (argument, _) in _REQUEST_TEMPLATES.items():
+        arguments = {argument: 42} if argument else None
+        content = {"type": "request", "command": command}
+        if arguments is not None:
+            content["arguments"] = arguments
+        content["seq"] = 7
+        
+        assert _make_templated_request(command, arguments, 7) == _encode_content(content)
+
+def test_framing_error_discards_buffer():
+    """Test a frame without Content-Length raises and does not poison later reads."""
+    from dap.io_handler import DAPFramingError
+
+    client = DAPClient()
+    
+    with pytest.raises(DAPFramingError):
+        list(client.recv(b"Bogus: 1\r\n\r\n{}"))
+    
+    events = list(client.recv(_wrap(b'{"seq": 1, "type": "event", "event": "stopped"}')))
+    assert len(events) == 1
+    assert events[0].event == "stopped"
+
+def test_io_read_message_across_chunks(tmp_path):
+    """Test `IO.read_message` returns one frame written in two parts."""
+    frame = _wrap(_STOPPED)
+    adapter = dap_io.IO(_writer_command(tmp_path, frame[:30], frame[30:]))
+    adapter.start()
+    try:
+        message = adapter.read_message()
+        assert message == frame
+        assert [e.event for e in DAPClient().recv(bytes(message))] == ["stopped"]
+    finally:
+        adapter.stop()
+
+def test_io_read_message_eof_mid_frame(tmp_path):
+    """Test `IO.read_message` returns nothing if stdout closes inside a frame."""
+    adapter = dap_io.IO(_writer_command(tmp_path, _wrap(_STOPPED)[:-5]))
+    adapter.start()
+    try:
+        assert adapter.read_message() == b""
+    finally:
+        adapter.stop()
+
+def test_io_read_loop_delivers_all_output(tmp_path):
+    """Test the selector read loop passes on every chunk and stops at EOF."""
+    frame = _wrap(_STOPPED)
+    adapter = dap_io.IO(_writer_command(tmp_path, frame[:30], frame[30:]))
+    received = []
+    adapter.on_output = received.append
+    adapter.start()
+    try:
+        adapter.read_thread = threading.Thread(target=adapter._read_loop, daemon=True)
+        adapter.read_thread.start()
+        adapter.read_thread.join(timeout=5)
+        assert not adapter.read_thread.is_alive()
+        assert b"".join(received) == frame
+    finally:
+        adapter.stop()
+
+def test_io_write_all_resumes_short_writes(monkeypatch):
+    """Test `IO._write_all` resends the unwritten tail of a short `writev`."""
+    written = bytearray()
+    batch_sizes = []
+
+    def short_writev(fd, buffers):
+        batch_sizes.append(len(buffers))
+        chunk = b"".join(bytes(buffer) for buffer in buffers)[:5]
+        written.extend(chunk)
+        return len(chunk)
+
+    class _Stdin:
+        def fileno(self):
+            return -1
+
+    monkeypatch.setattr(dap_io.os, "writev", short_writev, raising=False)
+    monkeypatch.setattr(dap_io, "_IOV_MAX", 2)
+    buffers = [b"Content-Length: 2\r\n\r\n", b"{}", b"abc", b"", b"0123456789"]
+    dap_io.IO._write_all(_Stdin(), list(buffers))
+
+    assert written == b"".join(buffers)
+    assert max(batch_sizes) <= 2
+
+def test_io_write_failure_refuses_further_writes(tmp_path, caplog):
+    """Test a broken pipe stops `write()` queueing and `stop()` still reaps the child."""
+    script = tmp_path / "closed_stdin.py"
+    script.write_text("import os, time\nos.close(0)\ntime.sleep(30)\n")
+    adapter = dap_io.IO(f"{shlex.quote(sys.executable)} {shlex.quote(str(script))}")
+    adapter.start()
+    try:
+        deadline = time.monotonic() + 5
+        while adapter.alive and time.monotonic() < deadline:
+            adapter.write(b"x" * 65536)
+            time.sleep(0.05)
+        assert not adapter.alive
+        assert adapter.is_running()
+
+        with caplog.at_level("WARNING", logger=dap_io.logger.name):
+            adapter.write(b"refused")
+        assert not adapter._write_buffers
+        assert "cannot write" in caplog.text
+    finally:
+        adapter.stop()
+    assert adapter.process.poll() is not None
+
+_ADAPTER = Path(__file__).resolve().parent.parent / "sandbox" / "simple_dap_adapter.py"
+
+def test_async_io_initialize_round_trip():
+    """Test `AsyncIO` drives an initialize exchange with the sample adapter."""
+    async def run():
+        adapter = dap_io.AsyncIO(f"{shlex.quote(sys.executable)} {shlex.quote(str(_ADAPTER))}")
+        await adapter.start()
+        try:
+            client = DAPClient()
+            await adapter.write(client.send())
+            # The initialize response, then the adapter's own initialized event.
+            events = list(client.recv(await adapter.read_message()))
+            events += client.recv_body(await adapter.read_body())
+            assert [e.event for e in events] == ["initialized", "initialized"]
+            assert client.is_initialized
+        finally:
+            await adapter.stop()
+        assert not adapter.is_running()
+
+    asyncio.run(run())
+
+def test_async_io_frame_across_reads_and_eof(tmp_path):
+    """Test `AsyncIO` joins a frame written in two parts and reports EOF."""
+    frame = _wrap(_STOPPED)
+
+    async def run():
+        adapter = dap_io.AsyncIO(_writer_command(tmp_path, frame[:30], frame[30:], frame[:-5]))
+        await adapter.start()
+        try:
+            assert await adapter.read_message() == frame
+            # Stdout closes inside the next frame.
+            assert await adapter.read_message() == b""
+            assert await adapter.read_body() == b""
+        finally:
+            await adapter.stop()
+
+    asyncio.run(run())
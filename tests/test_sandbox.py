@@ -0,0 +1,223 @@
+
+import importlib.util
+import itertools
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("tkinter")
+
+from dap.client import DAPClient, ClientState
+
+# The editor is a script importing `dap_io` from its own directory.
+_SANDBOX = Path(__file__).resolve().parent.parent / "sandbox" / "sandbox.py"
+sys.path.insert(0, str(_SANDBOX.parent))
+_spec = importlib.util.spec_from_file_location("dap_sandbox", _SANDBOX)
+sandbox = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(sandbox)
+
+
+class _FakeIO:
+    alive = True
+
+    def __init__(self):
+        self.writes = []
+
+    def write(self, data):
+        self.writes.append(data)
+
+
+class _FakeTree:
+    """Just enough of `ttk.Treeview` to record each item's children in order."""
+
+    def __init__(self):
+        self.children = {"": []}
+        self.items = {}
+        self._ids = itertools.count()
+
+    def insert(self, parent, index, text="", values=()):
+        item = f"I{next(self._ids)}"
+        self.items[item] = {"parent": parent, "text": text, "values": values, "open": False}
+        self.children[item] = []
+        if index == "end":
+            self.children[parent].append(item)
+        else:
+            self.children[parent].insert(index, item)
+        return item
+
+    def item(self, item, option=None, **kwargs):
+        if option is not None:
+            return self.items[item][option]
+        self.items[item].update(kwargs)
+
+    def move(self, item, parent, index):
+        self.children[self.items[item]["parent"]].remove(item)
+        self.items[item]["parent"] = parent
+        self.children[parent].insert(index, item)
+
+    def delete(self, *items):
+        for item in items:
+            self.delete(*self.children.pop(item))
+            self.children[self.items.pop(item)["parent"]].remove(item)
+
+    def get_children(self, item=""):
+        return tuple(self.children[item])
+
+    def exists(self, item):
+        return True
+
+    def texts(self, parent=""):
+        return [self.items[child]["text"] for child in self.children[parent]]
+
+
+class _FakeRoot:
+    def event_generate(self, sequence, when=None):
+        pass
+
+
+def _frame(body):
+    return b"Content-Length: %d\r\n\r\n%b" % (len(body), body)
+
+
+def _make_editor():
+    """Build a `DAPEditor` with its non-widget state, without Tk."""
+    editor = sandbox.DAPEditor.__new__(sandbox.DAPEditor)
+    editor._init_state()
+    editor.dap_client = DAPClient()
+    editor.dap_client.send()
+    editor.dap_client._state = ClientState.NORMAL
+    editor.io_handler = _FakeIO()
+    editor.current_file = "/tmp/example.py"
+    editor.root = _FakeRoot()
+    editor.logged = []
+    editor.log_output = editor.logged.append
+    editor.breakpoints_tree = _FakeTree()
+    editor.variables_tree = _FakeTree()
+    return editor
+
+
+def _set_breakpoints(editor, lines):
+    for line in lines:
+        editor.breakpoints[line] = {"line": line, "verified": None}
+    editor._sorted_bp_lines = sorted(editor.breakpoints)
+    editor._bp_version += 1
+
+
+def _respond(editor, request_seq, success=True, body=None, command="setBreakpoints"):
+    content = {
+        "type": "response",
+        "seq": request_seq,
+        "request_seq": request_seq,
+        "command": command,
+        "success": success,
+    }
+    if success:
+        content["body"] = body or {}
+    else:
+        content["message"] = "adapter said no"
+    encoded = json.dumps(content).encode("utf-8")
+    for event in editor.dap_client.recv(b"Content-Length: %d\r\n\r\n%b" % (len(encoded), encoded)):
+        editor.handle_dap_event(event)
+
+
+def test_failed_set_breakpoints_is_retried():
+    """Test a failed setBreakpoints does not block the next sync."""
+    editor = _make_editor()
+    _set_breakpoints(editor, [10])
+
+    editor.sync_breakpoints()
+    assert len(editor.io_handler.writes) == 1
+    # Already in flight: not sent again.
+    editor.sync_breakpoints()
+    assert len(editor.io_handler.writes) == 1
+
+    _respond(editor, request_seq=1, success=False)
+
+    editor.sync_breakpoints()
+    assert len(editor.io_handler.writes) == 2
+
+
+def test_set_breakpoints_results_follow_their_request():
+    """Test overlapping syncs pair each response with the lines it sent."""
+    editor = _make_editor()
+    _set_breakpoints(editor, [10, 20])
+    editor.sync_breakpoints()
+    first = (editor.current_file, editor._bp_version)
+
+    # Toggled while the first request is in flight.
+    _set_breakpoints(editor, [15])
+    editor.sync_breakpoints()
+    assert len(editor.io_handler.writes) == 2
+
+    _respond(editor, request_seq=1, body={"breakpoints": [{"verified": True}, {"verified": False}]})
+    assert editor.breakpoints[10]["verified"] is True
+    assert editor.breakpoints[15]["verified"] is None
+    assert editor.breakpoints[20]["verified"] is False
+    # Only the first version has been acknowledged.
+    assert editor._synced_bp == first
+
+    _respond(editor, request_seq=2, body={"breakpoints": [{"verified": True}] * 3})
+    assert all(bp["verified"] is True for bp in editor.breakpoints.values())
+    assert editor._synced_bp == (editor.current_file, editor._bp_version)
+
+
+def test_failed_variables_request_can_be_retried():
+    """Test a node whose variables request failed is fetched again when reopened."""
+    editor = _make_editor()
+    editor._var_refs["I1"] = 7
+
+    editor._load_variable_children("I1")
+    assert len(editor.io_handler.writes) == 1
+    # Not requested twice while in flight.
+    editor._load_variable_children("I1")
+    assert len(editor.io_handler.writes) == 1
+
+    _respond(editor, request_seq=1, success=False, command="variables")
+    assert editor._pending_variables == {}
+    assert editor._var_refs == {"I1": 7}
+
+    editor._load_variable_children("I1")
+    assert len(editor.io_handler.writes) == 2
+
+
+def _show(editor, names):
+    editor.show_variables("", [{"name": name, "value": "1"} for name in names])
+
+
+def test_variable_rows_keep_their_order():
+    """Test reused, new and removed variables rows end up in the response's order."""
+    editor = _make_editor()
+    # A removed row in front of a reused one.
+    _show(editor, ["a", "b"])
+    reused = editor.variables_tree.get_children()[1]
+    _show(editor, ["c", "b", "d"])
+    assert editor.variables_tree.texts() == ["c", "b", "d"]
+    assert editor.variables_tree.get_children()[1] == reused
+
+    for old_size, new_size in itertools.product(range(4), repeat=2):
+        for old in itertools.permutations("abcd", old_size):
+            for new in itertools.permutations("abcd", new_size):
+                editor = _make_editor()
+                _show(editor, old)
+                _show(editor, new)
+                assert editor.variables_tree.texts() == list(new), (old, new)
+
+
+def test_reader_skips_bad_messages():
+    """Test malformed adapter output is logged and later messages still arrive."""
+    editor = _make_editor()
+    stopped = _frame(b'{"seq": 1, "type": "event", "event": "stopped"}')
+    continued = _frame(b'{"seq": 2, "type": "event", "event": "continued"}')
+
+    # Valid JSON but not a DAP message, followed by a good frame in the same read.
+    assert editor._receive_dap_data(_frame(b'{"type": "event"}') + stopped) == 1
+    # Unframeable data, then a good frame in a later read.
+    assert editor._receive_dap_data(b"Bogus: 1\r\n\r\n{}") == 0
+    assert editor._receive_dap_data(continued) == 1
+
+    events = [editor.event_queue.get_nowait() for _ in range(2)]
+    assert [e.event for e in events] == ["stopped", "continued"]
+    assert any(line.startswith("Skipped invalid DAP message") for line in editor.logged)
+    assert any(line.startswith("Dropped unframeable data") for line in editor.logged)